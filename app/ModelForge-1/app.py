@@ -1,5 +1,6 @@
 import os
 import logging
+import orjson
 from flask import Flask
 from sqlalchemy.orm import declarative_base
 from werkzeug.middleware.proxy_fix import ProxyFix
@@ -35,6 +36,9 @@ app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL", "sqlite:/
 app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
     "pool_recycle": 300,
     "pool_pre_ping": True,
+    # JSON columns (chat meta_data, environment data, ...) go through orjson
+    "json_serializer": lambda obj: orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode(),
+    "json_deserializer": orjson.loads,
 }
 
 # Configure Redis and Celery
@@ -42,6 +42,7 @@ class GenerationRequest(BaseModel):
     texture_resolution: int = 1024
     use_roblox_materials: bool = True
     poly_budget: Optional[int] = None
+    export_format: str = "glb"
 
 class GenerationJob:
     """Track generation jobs"""
@@ -107,7 +108,8 @@ async def process_generation(job_id: str):
             auto_texture=job.request.auto_texture,
             texture_resolution=job.request.texture_resolution,
             use_roblox_materials=job.request.use_roblox_materials,
-            poly_budget=job.request.poly_budget
+            poly_budget=job.request.poly_budget,
+            export_format=job.request.export_format
         )
         
         # Update progress
@@ -128,10 +128,11 @@ class AdvancedModelGenerator:
             # Pass enhanced prompt to enforce simplicity
             geometry_result = self.geometry_generator.generate_geometry(prompt_enhanced, reference_image_path)
             if geometry_result['success']:
-                # Convert numpy arrays to trimesh
+                # Convert numpy arrays to trimesh; the primitives are already
+                # merged and consistently wound, so skip trimesh processing
                 vertices = geometry_result['vertices']
                 faces = geometry_result['faces']
-                mesh = trimesh.Trimesh(vertices=vertices, faces=faces)
+                mesh = trimesh.Trimesh(vertices=vertices, faces=faces, process=False)
                 return mesh
         except Exception as e:
             logger.warning(f"Geometry generator failed, falling back to traditional procedural generation: {e}")
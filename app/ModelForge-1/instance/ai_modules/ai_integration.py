@@ -10,17 +10,54 @@ import requests
 import json
 import time
 import base64
-from typing import Dict, List, Optional, Any, Tuple
+import mmap
+import functools
+from typing import Callable, Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
 from enum import Enum
 import openai
+import orjson
 import trimesh
 import numpy as np
+from tenacity import (
+    retry, stop_after_attempt, wait_exponential_jitter,
+    retry_if_exception_type, retry_if_result
+)
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Gateway/rate-limit statuses worth retrying before falling back to another service
+RETRYABLE_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+@retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential_jitter(initial=0.2, max=2.0),
+    retry=(retry_if_exception_type((requests.ConnectionError, requests.Timeout)) |
+           retry_if_result(lambda response: response.status_code in RETRYABLE_STATUS_CODES)),
+    retry_error_callback=lambda state: state.outcome.result()
+)
+def _post_with_retry(url: str, **kwargs) -> requests.Response:
+    """POST with exponential backoff on transient network errors and retryable statuses"""
+    return requests.post(url, **kwargs)
+
+@functools.lru_cache(maxsize=32)
+def _encode_image_cached(image_path: str, mtime: float, size: int) -> str:
+    """Base64-encode an image file; mtime and size key the cache so edits invalidate it"""
+    if size == 0:
+        # mmap refuses zero-length files
+        return ''
+    with open(image_path, 'rb') as image_file, \
+            mmap.mmap(image_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        return base64.b64encode(mapped).decode('ascii')
+
+@functools.lru_cache(maxsize=None)
+def _unit_circle(n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Cos/sin tables for n evenly spaced angles around the circle"""
+    angles = np.arange(n) * 2 * np.pi / n
+    return np.cos(angles), np.sin(angles)
+
 class AIService(Enum):
     """Available AI services"""
     OPENAI = "openai"
@@ -44,12 +81,18 @@ class AIIntegration:
     
     def __init__(self, config: AIConfig):
         self.config = config
+        self._rng = np.random.default_rng()
         self.setup_service()
     
     def setup_service(self):
         """Setup the AI service based on configuration"""
         if self.config.service == AIService.OPENAI:
-            openai.api_key = self.config.api_key
+            # The client retries 429/5xx/connection errors with exponential backoff
+            self.client = openai.OpenAI(
+                api_key=self.config.api_key,
+                max_retries=3,
+                timeout=self.config.timeout
+            )
         elif self.config.service == AIService.STABILITY_AI:
             # Setup Stability AI client
             pass
@@ -93,7 +136,7 @@ class AIIntegration:
             enhanced_prompt = self._enhance_prompt_for_3d(prompt)
             
             # Generate detailed description
-            description_response = openai.ChatCompletion.create(
+            description_response = self.client.chat.completions.create(
                 model=self.config.model,
                 messages=[
                     {"role": "system", "content": "You are a 3D modeling expert. Generate detailed technical specifications for creating a 3D model based on the user's description."},
@@ -159,15 +202,15 @@ class AIIntegration:
                 }
             }
             
-            response = requests.post(
+            response = _post_with_retry(
                 api_url,
                 headers=headers,
-                json=payload,
+                data=orjson.dumps(payload),
                 timeout=self.config.timeout
             )
             
             if response.status_code == 200:
-                result = response.json()
+                result = orjson.loads(response.content)
                 return {
                     'success': True,
                     'mesh': self._parse_custom_api_response(result),
@@ -257,20 +300,8 @@ class AIIntegration:
         style = params['style']
         
         # Create base mesh based on shape type
-        if shape_type == 'vehicle':
-            mesh = self._create_vehicle_mesh(complexity, style)
-        elif shape_type == 'building':
-            mesh = self._create_building_mesh(complexity, style)
-        elif shape_type == 'character':
-            mesh = self._create_character_mesh(complexity, style)
-        elif shape_type == 'weapon':
-            mesh = self._create_weapon_mesh(complexity, style)
-        elif shape_type == 'furniture':
-            mesh = self._create_furniture_mesh(complexity, style)
-        elif shape_type == 'nature':
-            mesh = self._create_nature_mesh(complexity, style)
-        else:
-            mesh = self._create_abstract_mesh(complexity, style)
+        builder = self._SHAPE_BUILDERS.get(shape_type, AIIntegration._create_abstract_mesh)
+        mesh = builder(self, complexity, style)
         
         # Apply complexity-based modifications
         mesh = self._apply_complexity_modifications(mesh, complexity)
@@ -317,12 +348,12 @@ class AIIntegration:
         
         # Add windows
         windows = []
+        cos4, sin4 = _unit_circle(4)
         for floor in range(floors):
             for side in range(4):
                 for window in range(3):
-                    angle = side * np.pi / 2
-                    x = 1.5 * np.cos(angle)
-                    y = 1.5 * np.sin(angle)
+                    x = 1.5 * cos4[side]
+                    y = 1.5 * sin4[side]
                     z = floor * 0.8 + 0.4
                     
                     window_mesh = trimesh.creation.box(extents=[0.2, 0.1, 0.4])
@@ -464,11 +495,11 @@ class AIIntegration:
         # Add branches
         branches = []
         branch_count = min(complexity // 2, 6)
+        branch_cos, branch_sin = _unit_circle(branch_count)
         
         for i in range(branch_count):
-            angle = i * 2 * np.pi / branch_count
-            x = 0.3 * np.cos(angle)
-            y = 0.3 * np.sin(angle)
+            x = 0.3 * branch_cos[i]
+            y = 0.3 * branch_sin[i]
             z = 1.5 + (i % 2) * 0.3
             
             branch = trimesh.creation.cylinder(radius=0.05, height=0.8)
@@ -478,12 +509,12 @@ class AIIntegration:
         # Add foliage
         foliage = []
         leaf_count = min(complexity * 2, 12)
+        leaf_cos, leaf_sin = _unit_circle(leaf_count)
         
         for i in range(leaf_count):
-            angle = i * 2 * np.pi / leaf_count
             radius = 0.4 + (i % 3) * 0.2
-            x = radius * np.cos(angle)
-            y = radius * np.sin(angle)
+            x = radius * leaf_cos[i]
+            y = radius * leaf_sin[i]
             z = 2.5 + (i % 4) * 0.2
             
             leaf = trimesh.creation.uv_sphere(radius=0.3)
@@ -515,7 +546,7 @@ class AIIntegration:
                 [0, 2, 3]
             ])
             
-            base = trimesh.Trimesh(vertices=vertices, faces=faces)
+            base = trimesh.Trimesh(vertices=vertices, faces=faces, process=False, validate=False)
             shapes.append(base)
         else:
             # Complex abstract
@@ -528,29 +559,41 @@ class AIIntegration:
         # Add complexity-based elements
         if complexity >= 6:
             # Add spiral elements
+            cos8, sin8 = _unit_circle(8)
+            _, sin4 = _unit_circle(4)
             for i in range(8):
-                angle = i * np.pi / 4
-                x = 0.8 * np.cos(angle)
-                y = 0.8 * np.sin(angle)
-                z = 0.2 * np.sin(i * np.pi / 2)
+                x = 0.8 * cos8[i]
+                y = 0.8 * sin8[i]
+                z = 0.2 * sin4[i % 4]
                 
                 spiral = trimesh.creation.cylinder(radius=0.05, height=0.4)
                 spiral.apply_translation([x, y, z])
                 shapes.append(spiral)
         
         if complexity >= 8:
-            # Add floating elements
-            for i in range(5):
-                element = trimesh.creation.uv_sphere(radius=0.1)
-                element.apply_translation([
-                    np.random.uniform(-1, 1),
-                    np.random.uniform(-1, 1),
-                    np.random.uniform(-1, 1)
-                ])
-                shapes.append(element)
+            # Add floating elements, tiling one sphere across all positions
+            element = trimesh.creation.uv_sphere(radius=0.1)
+            positions = self._rng.uniform(-1, 1, size=(5, 3))
+            offsets = np.arange(len(positions))[:, None, None] * len(element.vertices)
+            shapes.append(trimesh.Trimesh(
+                vertices=(element.vertices[None, :, :] + positions[:, None, :]).reshape(-1, 3),
+                faces=(element.faces[None, :, :] + offsets).reshape(-1, 3),
+                process=False,
+                validate=False
+            ))
         
         return trimesh.util.concatenate(shapes)
     
+    # Shape type -> mesh builder; unknown types fall back to the abstract builder
+    _SHAPE_BUILDERS: Dict[str, Callable[['AIIntegration', int, str], trimesh.Trimesh]] = {
+        'vehicle': _create_vehicle_mesh,
+        'building': _create_building_mesh,
+        'character': _create_character_mesh,
+        'weapon': _create_weapon_mesh,
+        'furniture': _create_furniture_mesh,
+        'nature': _create_nature_mesh,
+    }
+    
     def _apply_complexity_modifications(self, mesh: trimesh.Trimesh, complexity: int) -> trimesh.Trimesh:
         """Apply complexity-based modifications to the mesh"""
         if complexity <= 3:
@@ -576,18 +619,17 @@ class AIIntegration:
         # Add noise for organic feel
         if complexity >= 7:
             vertices = modified_mesh.vertices.copy()
-            noise = np.random.normal(0, 0.01 * complexity, vertices.shape)
+            noise = self._rng.standard_normal(vertices.shape) * (0.01 * complexity)
             vertices += noise
-            modified_mesh = trimesh.Trimesh(vertices=vertices, faces=modified_mesh.faces)
+            modified_mesh = trimesh.Trimesh(vertices=vertices, faces=modified_mesh.faces, process=False, validate=False)
         
         return modified_mesh
     
     def _encode_image(self, image_path: str) -> Optional[str]:
         """Encode image to base64 for API transmission"""
         try:
-            with open(image_path, 'rb') as image_file:
-                encoded = base64.b64encode(image_file.read()).decode('utf-8')
-                return encoded
+            stat = os.stat(image_path)
+            return _encode_image_cached(image_path, stat.st_mtime, stat.st_size)
         except Exception as e:
             logger.error(f"Failed to encode image: {e}")
             return None
@@ -1,15 +1,560 @@
 import os
+import re
+import atexit
 import logging
-import json
 import uuid
+import asyncio
+import contextvars
+import threading
+import time
+import weakref
+import itertools
+import copy
+import functools
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import Future
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+import numpy as np
 import openai
+import orjson
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_random_exponential
 
 # Set up OpenAI client if API key is available
 openai_client = None
 if os.environ.get("OPENAI_API_KEY"):
-    openai_client = openai.OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+    # Retries are handled by tenacity in ChatHandler._create_completion
+    openai_client = openai.AsyncOpenAI(api_key=os.environ.get("OPENAI_API_KEY"), max_retries=0)
+
+# Transient OpenAI failures worth retrying before dropping to the rule-based fallback
+RETRYABLE_OPENAI_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+# Keyword sets for the rule-based fallback, matched against tokenize_message() output
+CREATE_KEYWORDS = frozenset({'create', 'generate', 'make', 'build'})
+MODEL_KEYWORDS = frozenset({'model', '3d', 'object', 'mesh'})
+SCRIPT_KEYWORDS = frozenset({'script', 'code', 'lua', 'python'})
+PROJECT_KEYWORDS = frozenset({'project', 'game', 'world'})
+ENVIRONMENT_KEYWORDS = frozenset({'world', 'level', 'map', 'environment', 'scene'})
+HELP_KEYWORDS = frozenset({'help', 'command', 'what can you do'})
+LIST_KEYWORDS = frozenset({'list', 'show', 'view'})
+
+# Ordered (label, keywords) pairs; the first matching entry wins
+SCRIPT_TYPE_KEYWORDS = (
+    ('lua', frozenset({'lua', 'roblox'})),
+    ('python', frozenset({'python'})),
+    ('csharp', frozenset({'c#', 'csharp', 'unity'})),
+)
+PROJECT_TYPES = ('roblox', 'unity', 'unreal')
+INTENT_KEYWORDS = (
+    ('create', CREATE_KEYWORDS),
+    ('list', frozenset({'list', 'show', 'view', 'display'})),
+    ('help', frozenset({'help', 'how', 'what can you', 'what can you do'})),
+    ('delete', frozenset({'delete', 'remove', 'clear'})),
+    ('edit', frozenset({'edit', 'modify', 'change', 'update'})),
+)
+
+# One scan yields both the multi-word phrases and the single-word keywords
+_TOKEN_PATTERN = re.compile(r"what\s+can\s+you(?:\s+do)?|[a-z0-9#]+")
+
+def tokenize_message(message: str) -> frozenset:
+    """
+    Lowercased token set of a message from a single regex pass
+    
+    Known phrases ('what can you do') come back as one whitespace-normalized
+    token, and plural 's' forms are also added in singular.
+    """
+    words = [' '.join(match.split()) for match in _TOKEN_PATTERN.findall(message.lower())]
+    return frozenset(words).union(word[:-1] for word in words if len(word) > 3 and word.endswith('s'))
+
+def _keyword_pattern(keywords: Tuple[str, ...]) -> 're.Pattern':
+    """Case-insensitive pattern matching any of the keywords as a whole whitespace-delimited word"""
+    return re.compile(r'(?<!\S)(?:%s)(?!\S)' % '|'.join(map(re.escape, keywords)), re.IGNORECASE)
+
+# Action words after which the description starts, found in one scan of the raw message
+MODEL_PROMPT_PATTERN = _keyword_pattern(('create', 'generate', 'make', 'build', 'model', '3d', 'object'))
+SCRIPT_PROMPT_PATTERN = _keyword_pattern(('script', 'code', 'function', 'lua', 'python', 'create', 'generate', 'make'))
+
+# "project"/"game" followed by up to three candidate name words; the lookahead
+# keeps later keywords inside those words available to the next match
+PROJECT_NAME_PATTERN = re.compile(r'(?<!\S)(?:project|game)(?=((?:\s+\S+){1,3}))', re.IGNORECASE)
+PROJECT_NAME_STOP_WORDS = frozenset({'that', 'which', 'with', 'using'})
+
+def _text_after_keyword(pattern: 're.Pattern', message: str) -> str:
+    """Everything after the first keyword match, or the whole message if nothing follows one"""
+    match = pattern.search(message)
+    remainder = message[match.end():].strip() if match else ''
+    return remainder or message
+
+# Action type -> confirmation message, shared by the function-call and fallback paths
+ACTION_RESPONSE_BUILDERS: Dict[str, Callable[[Dict], str]] = {
+    'generate_3d_model': lambda args: f"I'll generate a 3D model: {args['prompt']}",
+    'generate_script': lambda args: f"I'll generate a {args['script_type']} script: {args['prompt']}",
+    'create_project': lambda args: f"I'll create a new {args.get('project_type', 'general')} project: {args['name']}",
+    'generate_environment': lambda args: f"I'll generate an environment: {args['prompt']}",
+}
+
+def describe_action(action_type: str, arguments: Dict) -> str:
+    """Confirmation message for an action about to be taken"""
+    builder = ACTION_RESPONSE_BUILDERS.get(action_type)
+    if builder is None:
+        return f"I'll execute the {action_type} command for you."
+    return builder(arguments)
+
+# Fixed reply to help requests, also used by the rule-based fallback
+HELP_RESPONSE = """I'm your AI game development assistant! Here's what I can help you with:
+
+🎮 **Create Projects**: "Create a new Roblox RPG game" or "Start a Unity platformer project"
+
+🎯 **Generate 3D Models**: "Create a medieval sword" or "Generate a futuristic spaceship"
+
+💻 **Write Scripts**: "Create a Lua script for NPC dialogue" or "Generate Python code for inventory system"
+
+🌍 **Build Environments**: "Create a fantasy forest world" or "Generate a space station map"
+
+📋 **Manage Projects**: "List my projects" or "Show my models"
+
+Just tell me what you want to create and I'll help you build it! You can be as specific or general as you like."""
+
+# Reply to a blank message
+EMPTY_MESSAGE_RESPONSE = "Tell me what you'd like to create or ask, and I'll help you build it!"
+
+# Messages answered with HELP_RESPONSE directly, without reading history or calling the API
+DIRECT_HELP_PATTERN = re.compile(
+    r"\s*(?:help|commands?|what\s+can\s+you\s+do|hi|hello|hey|greetings)\s*[?!.]*\s*",
+    re.IGNORECASE
+)
+
+# Static system prompt; kept byte-identical across turns so OpenAI can cache the prefix
+SYSTEM_PROMPT = """You are an AI assistant that helps users create game assets and manage game development projects. You can:
+
+1. Generate 3D models from text descriptions
+2. Create scripts (Lua for Roblox, Python, C#) 
+3. Generate game environments and worlds
+4. Create and manage projects
+5. Provide guidance on game development
+
+When users ask for something to be created or generated, use the appropriate function to take action. Be helpful, creative, and provide clear explanations of what you're doing.
+
+For Roblox projects, focus on Lua scripting and Roblox-specific features.
+For Unity projects, focus on C# scripting and Unity features.
+For general projects, adapt to the user's needs.
+
+Always be encouraging and help users learn game development concepts."""
+
+# Function schema offered to the model on every completion
+CHAT_FUNCTIONS = (
+    {
+        "name": "generate_3d_model",
+        "description": "Generate a 3D model from a text description",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "prompt": {"type": "string", "description": "Description of the 3D model"},
+                "project_id": {"type": "integer", "description": "Project ID to add model to"}
+            },
+            "required": ["prompt"]
+        }
+    },
+    {
+        "name": "generate_script",
+        "description": "Generate a script (Lua, Python, etc.) from description",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "prompt": {"type": "string", "description": "Description of script functionality"},
+                "script_type": {"type": "string", "description": "Type of script (lua, python, csharp)"},
+                "project_id": {"type": "integer", "description": "Project ID to add script to"}
+            },
+            "required": ["prompt", "script_type"]
+        }
+    },
+    {
+        "name": "create_project",
+        "description": "Create a new project",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string", "description": "Project name"},
+                "description": {"type": "string", "description": "Project description"},
+                "project_type": {"type": "string", "description": "Project type (roblox, unity, general)"}
+            },
+            "required": ["name", "description"]
+        }
+    },
+    {
+        "name": "generate_environment",
+        "description": "Generate a game environment/world",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "prompt": {"type": "string", "description": "Description of the environment"},
+                "project_id": {"type": "integer", "description": "Project ID to add environment to"}
+            },
+            "required": ["prompt"]
+        }
+    }
+)
+
+# Function name -> argument names that must be present before its action can run
+REQUIRED_FUNCTION_ARGUMENTS = {
+    function['name']: frozenset(function['parameters']['required']) for function in CHAT_FUNCTIONS
+}
+
+def parse_complete_arguments(buffer: str) -> Optional[Dict]:
+    """
+    Parse streamed function-call arguments once the JSON object has closed
+    
+    Returns None while the arguments are still arriving, so an action is
+    never dispatched with fields (like project_id) the model has yet to send.
+    """
+    if not buffer.rstrip().endswith('}'):
+        return None
+    try:
+        arguments = orjson.loads(buffer)
+    except ValueError:
+        return None
+    return arguments if isinstance(arguments, dict) else None
+
+# Version tag for the OpenAI prompt cache key of the static system prompt
+SYSTEM_PROMPT_VERSION = "v1"
+
+# Input token budget for system prompts, history and the current message;
+# history is trimmed newest-first to fit what is left
+PROMPT_TOKEN_BUDGET = 2000
+# Per-message overhead the chat format adds on top of the content tokens
+MESSAGE_TOKEN_OVERHEAD = 4
+
+
+@functools.lru_cache(maxsize=1)
+def _get_encoding():
+    """Load the gpt-4o tokenizer once (the first call may fetch its BPE file); None if unavailable"""
+    try:
+        import tiktoken
+        return tiktoken.encoding_for_model("gpt-4o")
+    except Exception as e:
+        logging.warning(f"tiktoken unavailable, estimating token counts from length: {e}")
+        return None
+
+
+@functools.lru_cache(maxsize=4096)
+def count_tokens(text: str) -> int:
+    """Token count for one message, cached since history repeats across turns"""
+    encoding = _get_encoding()
+    if encoding is None:
+        # About four characters per token for English text
+        return len(text) // 4 + 1 + MESSAGE_TOKEN_OVERHEAD
+    return len(encoding.encode(text)) + MESSAGE_TOKEN_OVERHEAD
+
+# Cap on in-flight OpenAI requests across all chat sessions
+MAX_CONCURRENT_AI_CALLS = 8
+_ai_semaphore = asyncio.Semaphore(MAX_CONCURRENT_AI_CALLS)
+
+# Completion length requested from the model; OpenAI counts it against the TPM limit up front
+MAX_REPLY_TOKENS = 1500
+
+class RateLimiter:
+    """
+    Preemptive requests-per-minute and tokens-per-minute buckets
+    
+    acquire() waits until both buckets have room and debits them before the
+    request is sent, so bursts queue here instead of coming back as 429s.
+    Waiters are served in arrival order. A limit of None leaves that bucket
+    unlimited.
+    """
+    
+    def __init__(self, requests_per_minute: Optional[int], tokens_per_minute: Optional[int]):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute or 0)
+        self._tokens = float(tokens_per_minute or 0)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        if self.requests_per_minute:
+            self._requests = min(self.requests_per_minute,
+                                 self._requests + elapsed * self.requests_per_minute / 60)
+        if self.tokens_per_minute:
+            self._tokens = min(self.tokens_per_minute,
+                               self._tokens + elapsed * self.tokens_per_minute / 60)
+    
+    async def acquire(self, tokens: int):
+        """Wait for one request and the given number of tokens"""
+        if self.tokens_per_minute:
+            # A request larger than the whole bucket would otherwise never be let through
+            tokens = min(tokens, self.tokens_per_minute)
+        async with self._lock:
+            while True:
+                self._refill()
+                waits = []
+                if self.requests_per_minute and self._requests < 1:
+                    waits.append((1 - self._requests) * 60 / self.requests_per_minute)
+                if self.tokens_per_minute and self._tokens < tokens:
+                    waits.append((tokens - self._tokens) * 60 / self.tokens_per_minute)
+                if not waits:
+                    if self.requests_per_minute:
+                        self._requests -= 1
+                    if self.tokens_per_minute:
+                        self._tokens -= tokens
+                    return
+                await asyncio.sleep(max(waits))
+
+def _env_limit(name: str) -> Optional[int]:
+    """Positive integer limit from the environment, or None when unset"""
+    value = os.environ.get(name)
+    return int(value) if value else None
+
+# Set OPENAI_RPM / OPENAI_TPM to the account's gpt-4o limits to enable
+# preemptive limiting; without them requests go straight to the API and 429s
+# are handled by the retry policy
+chat_rate_limiter: Optional[RateLimiter] = None
+if _env_limit('OPENAI_RPM') or _env_limit('OPENAI_TPM'):
+    chat_rate_limiter = RateLimiter(
+        requests_per_minute=_env_limit('OPENAI_RPM'),
+        tokens_per_minute=_env_limit('OPENAI_TPM')
+    )
+
+# Shared event loop for chat coroutines, so concurrent requests overlap their API waits
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Start the chat event loop thread on first use"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name='chat-handler-loop', daemon=True).start()
+    return _loop
+
+def run_sync(coro: Awaitable[Any]) -> Any:
+    """
+    Run a ChatHandler coroutine from synchronous (Flask) code
+    
+    The coroutine runs on the shared chat loop with a copy of the caller's
+    context, so the Flask app context (and with it db.session) stays visible.
+    """
+    loop = _get_loop()
+    context = contextvars.copy_context()
+    result: Future = Future()
+    
+    def _done(task: asyncio.Task):
+        if task.cancelled():
+            result.cancel()
+        elif task.exception() is not None:
+            result.set_exception(task.exception())
+        else:
+            result.set_result(task.result())
+    
+    def _start():
+        loop.create_task(coro, context=context).add_done_callback(_done)
+    
+    loop.call_soon_threadsafe(_start)
+    return result.result()
+
+def iter_sync(events: AsyncIterator[Any]) -> Iterator[Any]:
+    """Drive an async generator on the chat loop from synchronous code, one item at a time"""
+    try:
+        while True:
+            try:
+                yield run_sync(events.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        # If the consumer stops early (client disconnect), close the generator
+        # now so its finally blocks release the API stream and its slot
+        run_sync(events.aclose())
+
+class ResponseCache:
+    """
+    Two-tier LRU cache of AI responses
+    
+    Tier 1 is an exact lookup on (project, message, prior conversation).
+    Tier 2 compares message embeddings by cosine similarity, restricted to
+    entries with the same project and prior conversation, so a paraphrase
+    of an earlier question can reuse its answer. Only plain-text replies
+    take part in tier 2: a paraphrase must never replay another request's
+    actions ("a red sword" vs "a blue sword").
+    """
+    
+    def __init__(self, max_entries: int = 256, ttl: float = 3600.0,
+                 similarity_threshold: float = 0.95):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self._entries: 'OrderedDict[str, Tuple[float, str, Optional[np.ndarray], Dict]]' = OrderedDict()
+    
+    @staticmethod
+    def make_keys(project_id: Optional[int], message: str, context: List[Dict]) -> Tuple[str, str]:
+        """Return (exact_key, scope) for a message and the conversation before it"""
+        prior = context[:-1] if context and context[-1].get('content') == message else context
+        scope = hashlib.blake2b(digest_size=16)
+        scope.update(str(project_id).encode())
+        for msg in prior[-4:]:
+            scope.update(f"\x00{msg['message_type']}\x00{msg['content']}".encode())
+        scope_digest = scope.hexdigest()
+        exact_key = hashlib.blake2b(f"{scope_digest}|{message}".encode(), digest_size=16).hexdigest()
+        return exact_key, scope_digest
+    
+    def get(self, key: str) -> Optional[Dict]:
+        """Exact-match lookup"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return copy.deepcopy(entry[3])
+    
+    def find_similar(self, scope: str, embedding: np.ndarray) -> Optional[Dict]:
+        """Return the closest cached response in scope above the similarity threshold"""
+        now = time.monotonic()
+        best_key, best_score = None, self.similarity_threshold
+        for key, (stored_at, entry_scope, vector, response) in self._entries.items():
+            if entry_scope != scope or vector is None or now - stored_at > self.ttl or response.get('actions'):
+                continue
+            score = float(np.dot(vector, embedding))
+            if score >= best_score:
+                best_key, best_score = key, score
+        return self.get(best_key) if best_key else None
+    
+    def put(self, key: str, scope: str, response: Dict, embedding: Optional[np.ndarray] = None):
+        """Store a response, evicting the least recently used entry when full"""
+        if response.get('actions'):
+            # Action replies are only ever served on an exact match
+            embedding = None
+        self._entries[key] = (time.monotonic(), scope, embedding, copy.deepcopy(response))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+# Shared across handler instances; only touched from the chat loop thread
+response_cache = ResponseCache()
+
+# Per-session locks; entries vanish once no turn of that session is running
+_session_locks: 'weakref.WeakValueDictionary[str, asyncio.Lock]' = weakref.WeakValueDictionary()
+
+def _session_lock(session_id: str) -> asyncio.Lock:
+    """Lock serializing the turns of one chat session"""
+    lock = _session_locks.get(session_id)
+    if lock is None:
+        lock = asyncio.Lock()
+        _session_locks[session_id] = lock
+    return lock
+
+# Cache key -> future of the API call currently answering it, so identical
+# concurrent requests share one call instead of each paying a round trip
+_inflight_requests: Dict[str, 'asyncio.Future[Optional[Dict]]'] = {}
+
+class MessageWriter:
+    """
+    Background writer for chat messages
+    
+    store_message() queues rows and returns immediately; a task on the chat
+    loop commits them in batches of up to WRITE_BATCH_SIZE rows, or whatever
+    has queued up after WRITE_BATCH_DELAY seconds, in a worker thread so the
+    loop keeps serving other turns. flushed() lets a reader wait until a
+    session's queued rows are in the database.
+    """
+    
+    WRITE_BATCH_SIZE = 32
+    WRITE_BATCH_DELAY = 0.02
+    
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._closing = False
+    
+    def put(self, bind, row, session_id: str):
+        """Queue a row for the given engine; must be called on the chat loop"""
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.get_running_loop().create_task(self._writer_loop())
+        
+        written = asyncio.get_running_loop().create_future()
+        self._pending[session_id] = written
+        self._queue.put_nowait((bind, row, session_id, written))
+    
+    async def flushed(self, session_id: str):
+        """Wait for the last queued row of a session to be written"""
+        written = self._pending.get(session_id)
+        if written is not None:
+            await asyncio.shield(written)
+    
+    async def _writer_loop(self):
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.monotonic() + self.WRITE_BATCH_DELAY
+            while len(batch) < self.WRITE_BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._write(batch)
+    
+    async def _write(self, batch: List[Tuple]):
+        # One engine per app in practice, but group in case several share the loop
+        by_bind: Dict[Any, List] = {}
+        for bind, row, _, _ in batch:
+            by_bind.setdefault(bind, []).append(row)
+        
+        for bind, rows in by_bind.items():
+            try:
+                if self._closing:
+                    # Worker threads are refused once interpreter shutdown starts
+                    self._commit(bind, rows)
+                else:
+                    await asyncio.to_thread(self._commit, bind, rows)
+            except Exception as e:
+                logging.error(f"Error writing chat messages: {e}")
+        
+        for _, _, session_id, written in batch:
+            if not written.done():
+                written.set_result(None)
+            if self._pending.get(session_id) is written:
+                del self._pending[session_id]
+            self._queue.task_done()
+    
+    @staticmethod
+    def _commit(bind, rows: List):
+        with Session(bind) as session:
+            session.add_all(rows)
+            session.commit()
+    
+    async def drain(self):
+        """Wait until every queued row has been written; used at shutdown"""
+        self._closing = True
+        if self._queue is not None:
+            await self._queue.join()
+
+# Shared across handler instances; only touched from the chat loop thread
+message_writer = MessageWriter()
+
+@atexit.register
+def _drain_message_writer():
+    """Flush queued chat messages before the interpreter exits"""
+    if _loop is not None and _loop.is_running():
+        try:
+            asyncio.run_coroutine_threadsafe(message_writer.drain(), _loop).result(timeout=5)
+        except Exception as e:
+            logging.error(f"Error draining chat message writer: {e}")
 
 class ChatHandler:
     """Handle AI chat conversations and command processing"""
@@ -17,7 +562,7 @@ class ChatHandler:
     def __init__(self, db_session):
         self.db = db_session
         
-    def process_message(self, message: str, session_id: str, project_id: Optional[int] = None) -> Dict:
+    async def process_message(self, message: str, session_id: str, project_id: Optional[int] = None) -> Dict:
         """
         Process a user message and generate AI response with actions
         
@@ -30,26 +575,37 @@ class ChatHandler:
             Dictionary with response and any actions to take
         """
         try:
-            # Store user message
-            self.store_message(session_id, 'user', message, project_id=project_id)
+            # Nothing to answer; don't store it or spend a request on it
+            if not message or not message.strip():
+                return {'response': EMPTY_MESSAGE_RESPONSE, 'actions': [], 'meta_data': {'direct': True}}
             
-            # Get conversation context
-            context = self.get_conversation_context(session_id)
-            
-            # Process with AI
-            if openai_client:
-                response_data = self.process_with_ai(message, context, project_id)
-            else:
-                response_data = self.process_with_fallback(message, context, project_id)
+            # Help requests and greetings have a fixed answer
+            if DIRECT_HELP_PATTERN.fullmatch(message):
+                self.store_message(session_id, 'user', message, project_id=project_id)
+                self.store_message(session_id, 'assistant', HELP_RESPONSE, project_id=project_id)
+                return {'response': HELP_RESPONSE, 'actions': [], 'meta_data': {'direct': True}}
             
-            # Store AI response
-            self.store_message(
-                session_id, 
-                'assistant', 
-                response_data['response'], 
-                meta_data=response_data.get('meta_data'),
-                project_id=project_id
-            )
+            # Turns in one session run one at a time so their messages stay ordered
+            async with _session_lock(session_id):
+                # Prior turns only; the current message is sent to the model explicitly
+                context = await self.get_conversation_context(session_id)
+                
+                # Queued now, so it is written while the AI call (or cache lookup) is in flight
+                self.store_message(session_id, 'user', message, project_id=project_id)
+                
+                if openai_client:
+                    response_data = await self.process_with_cache(message, context, project_id)
+                else:
+                    response_data = self.process_with_fallback(message, context, project_id)
+                
+                # Store AI response; the reply goes out without waiting for the write
+                self.store_message(
+                    session_id, 
+                    'assistant', 
+                    response_data['response'], 
+                    meta_data=response_data.get('meta_data'),
+                    project_id=project_id
+                )
             
             return response_data
             
@@ -61,87 +617,79 @@ class ChatHandler:
                 'error': str(e)
             }
     
-    def process_with_ai(self, message: str, context: List[Dict], project_id: Optional[int] = None) -> Dict:
-        """Process message using OpenAI API"""
+    async def process_with_cache(self, message: str, context: List[Dict], project_id: Optional[int] = None) -> Dict:
+        """Serve from the exact or semantic response cache, calling the API on a miss"""
         
-        # Build system prompt
-        system_prompt = self.build_system_prompt(project_id)
+        key, scope = response_cache.make_keys(project_id, message, context)
+        cached = response_cache.get(key)
+        if cached is not None:
+            cached['meta_data'] = {**(cached.get('meta_data') or {}), 'cache_hit': True}
+            return cached
         
-        # Build conversation messages
-        messages = [{"role": "system", "content": system_prompt}]
+        # Piggyback on an identical request that is already in flight
+        pending = _inflight_requests.get(key)
+        if pending is not None:
+            shared = await asyncio.shield(pending)
+            if shared is not None:
+                shared = copy.deepcopy(shared)
+                shared['meta_data'] = {**(shared.get('meta_data') or {}), 'coalesced': True}
+                return shared
         
-        # Add context messages
-        for msg in context[-10:]:  # Keep last 10 messages for context
-            messages.append({
-                "role": msg['message_type'],
-                "content": msg['content']
-            })
+        future = asyncio.get_running_loop().create_future()
+        _inflight_requests[key] = future
+        response_data = None
+        try:
+            response_data = await self._process_cache_miss(key, scope, message, context, project_id)
+            return response_data
+        finally:
+            # None tells waiters to make their own call
+            _inflight_requests.pop(key, None)
+            future.set_result(response_data)
+    
+    async def _process_cache_miss(self, key: str, scope: str, message: str,
+                                  context: List[Dict], project_id: Optional[int] = None) -> Dict:
+        """Try the semantic tier, then call the API and cache the answer"""
         
-        # Add current message
-        messages.append({"role": "user", "content": message})
+        # The embedding and the completion run side by side, so a miss costs no
+        # extra round trip; a semantic hit cancels the completion instead
+        embedding_task = asyncio.ensure_future(self.embed_message(message))
+        completion_task = asyncio.ensure_future(self.process_with_ai(message, context, project_id))
+        try:
+            embedding = await embedding_task
+            if embedding is not None:
+                cached = response_cache.find_similar(scope, embedding)
+                if cached is not None:
+                    completion_task.cancel()
+                    cached['meta_data'] = {**(cached.get('meta_data') or {}), 'cache_hit': True}
+                    return cached
+            
+            response_data = await completion_task
+        except BaseException:
+            completion_task.cancel()
+            raise
         
+        # Only cache real AI answers, never the rule-based fallback
+        if (response_data.get('meta_data') or {}).get('ai_generated'):
+            response_cache.put(key, scope, response_data, embedding)
+        
+        return response_data
+    
+    async def embed_message(self, message: str) -> Optional[np.ndarray]:
+        """Unit-length embedding of a message for semantic cache lookups"""
         try:
-            # the newest OpenAI model is "gpt-4o" which was released May 13, 2024.
-            # do not change this unless explicitly requested by the user
-            response = openai_client.chat.completions.create(
-                model="gpt-4o",
-                messages=messages,
-                max_tokens=1500,
-                temperature=0.7,
-                functions=[
-                    {
-                        "name": "generate_3d_model",
-                        "description": "Generate a 3D model from a text description",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "prompt": {"type": "string", "description": "Description of the 3D model"},
-                                "project_id": {"type": "integer", "description": "Project ID to add model to"}
-                            },
-                            "required": ["prompt"]
-                        }
-                    },
-                    {
-                        "name": "generate_script",
-                        "description": "Generate a script (Lua, Python, etc.) from description",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "prompt": {"type": "string", "description": "Description of script functionality"},
-                                "script_type": {"type": "string", "description": "Type of script (lua, python, csharp)"},
-                                "project_id": {"type": "integer", "description": "Project ID to add script to"}
-                            },
-                            "required": ["prompt", "script_type"]
-                        }
-                    },
-                    {
-                        "name": "create_project",
-                        "description": "Create a new project",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "name": {"type": "string", "description": "Project name"},
-                                "description": {"type": "string", "description": "Project description"},
-                                "project_type": {"type": "string", "description": "Project type (roblox, unity, general)"}
-                            },
-                            "required": ["name", "description"]
-                        }
-                    },
-                    {
-                        "name": "generate_environment",
-                        "description": "Generate a game environment/world",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "prompt": {"type": "string", "description": "Description of the environment"},
-                                "project_id": {"type": "integer", "description": "Project ID to add environment to"}
-                            },
-                            "required": ["prompt"]
-                        }
-                    }
-                ],
-                function_call="auto"
-            )
+            result = await openai_client.embeddings.create(model="text-embedding-3-small", input=message)
+            vector = np.asarray(result.data[0].embedding, dtype=np.float32)
+            return vector / np.linalg.norm(vector)
+        except Exception as e:
+            logging.warning(f"Embedding failed, skipping semantic cache: {e}")
+            return None
+    
+    async def process_with_ai(self, message: str, context: List[Dict], project_id: Optional[int] = None) -> Dict:
+        """Process message using OpenAI API"""
+        
+        try:
+            messages = self._build_messages(message, context, project_id)
+            response = await self._create_completion(messages, project_id)
             
             response_message = response.choices[0].message
             
@@ -159,63 +707,248 @@ class ChatHandler:
             logging.error(f"OpenAI API error: {e}")
             return self.process_with_fallback(message, context, project_id)
     
+    async def process_message_stream(self, message: str, session_id: str,
+                                     project_id: Optional[int] = None) -> AsyncIterator[Dict]:
+        """
+        Stream an AI response as it is generated
+        
+        Yields {'delta': text} events while tokens arrive, then one final
+        {'done': True, ...} event carrying the same fields as process_message.
+        A function call whose arguments are complete before the stream ends
+        is emitted early as an {'actions': [...]} event and is listed under
+        'dispatched_actions' (not 'actions') in the final event.
+        The assistant reply is stored once, after the stream completes.
+        """
+        try:
+            context = await self.get_conversation_context(session_id)
+            self.store_message(session_id, 'user', message, project_id=project_id)
+            
+            if openai_client:
+                response_data = None
+                async for event in self.process_with_ai_stream(message, context, project_id):
+                    if event.get('done'):
+                        response_data = event
+                    else:
+                        yield event
+            else:
+                response_data = self.process_with_fallback(message, context, project_id)
+                yield {'delta': response_data['response']}
+                response_data = {'done': True, **response_data}
+            
+            self.store_message(
+                session_id,
+                'assistant',
+                response_data['response'],
+                meta_data=response_data.get('meta_data'),
+                project_id=project_id
+            )
+            
+            yield response_data
+            
+        except Exception as e:
+            logging.error(f"Error streaming chat message: {e}")
+            yield {
+                'done': True,
+                'response': "I'm having trouble processing your request right now. Please try again.",
+                'actions': [],
+                'error': str(e)
+            }
+    
+    async def process_with_ai_stream(self, message: str, context: List[Dict],
+                                     project_id: Optional[int] = None) -> AsyncIterator[Dict]:
+        """Streaming variant of process_with_ai; yields deltas, then a final 'done' event"""
+        
+        content_parts = []
+        function_name = ''
+        function_arguments = []
+        dispatched = None
+        
+        try:
+            messages = self._build_messages(message, context, project_id)
+            # Holds one of the concurrency slots until the stream is done
+            stream = await self._create_completion(messages, project_id, stream=True)
+            try:
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta
+                    if delta.function_call:
+                        function_name += delta.function_call.name or ''
+                        function_arguments.append(delta.function_call.arguments or '')
+                        
+                        # Hand the action off as soon as its arguments object is complete,
+                        # without waiting for the stream itself to finish
+                        if dispatched is None and function_name in REQUIRED_FUNCTION_ARGUMENTS:
+                            arguments = parse_complete_arguments(''.join(function_arguments))
+                            if arguments is not None and REQUIRED_FUNCTION_ARGUMENTS[function_name] <= arguments.keys():
+                                dispatched = self.build_function_response(function_name, arguments, project_id)
+                                yield {'actions': dispatched['actions']}
+                    if delta.content:
+                        content_parts.append(delta.content)
+                        yield {'delta': delta.content}
+            finally:
+                # Also runs when the client disconnects and this generator is closed
+                await stream.close()
+                _ai_semaphore.release()
+            
+            if dispatched is not None:
+                # Already executed by the caller; report them without re-running
+                result = {**dispatched, 'actions': [], 'dispatched_actions': dispatched['actions']}
+                yield {'delta': result['response']}
+            elif function_name:
+                result = self.handle_function_call(
+                    SimpleNamespace(name=function_name, arguments=''.join(function_arguments)),
+                    project_id
+                )
+                yield {'delta': result['response']}
+            else:
+                result = {
+                    'response': ''.join(content_parts),
+                    'actions': [],
+                    'meta_data': {'ai_generated': True}
+                }
+                
+        except Exception as e:
+            logging.error(f"OpenAI streaming error: {e}")
+            if content_parts:
+                # Keep what the user has already seen rather than switching answers mid-stream
+                result = {
+                    'response': ''.join(content_parts),
+                    'actions': [],
+                    'meta_data': {'ai_generated': True, 'stream_interrupted': True}
+                }
+            else:
+                result = self.process_with_fallback(message, context, project_id)
+                yield {'delta': result['response']}
+        
+        yield {'done': True, **result}
+    
+    def _build_messages(self, message: str, context: List[Dict], project_id: Optional[int] = None) -> List[Dict]:
+        """Build the chat completion message list"""
+        
+        # The static system prompt leads so OpenAI can reuse its cached prefix;
+        # per-project details follow in their own message
+        messages = [{"role": "system", "content": self.build_system_prompt()}]
+        
+        project_context = self.build_project_context(project_id)
+        if project_context:
+            messages.append({"role": "system", "content": project_context})
+        
+        # Add as much recent history as the token budget allows, newest first
+        budget = PROMPT_TOKEN_BUDGET - count_tokens(message) - sum(
+            count_tokens(m['content']) for m in messages)
+        history = []
+        for msg in reversed(context):
+            budget -= count_tokens(msg['content'])
+            if budget < 0:
+                break
+            history.append({
+                "role": msg['message_type'],
+                "content": msg['content']
+            })
+        messages.extend(reversed(history))
+        
+        # Add current message
+        messages.append({"role": "user", "content": message})
+        
+        return messages
+    
+    @retry(
+        retry=retry_if_exception_type(RETRYABLE_OPENAI_ERRORS),
+        wait=wait_random_exponential(min=1, max=30),
+        stop=stop_after_attempt(5),
+        reraise=True
+    )
+    async def _create_completion(self, messages: List[Dict], project_id: Optional[int] = None, **kwargs):
+        """
+        Issue the chat completion request with the assistant's function schema
+        
+        Each attempt waits on the rate limiter before taking one of the
+        MAX_CONCURRENT_AI_CALLS slots, and tenacity's backoff runs between
+        attempts, so a throttled request never sleeps while holding a slot.
+        The slot is released on return, except with stream=True: then the
+        caller owns it and must call _ai_semaphore.release() once the stream
+        is finished or closed.
+        """
+        # Each attempt is its own request, so retries are rate limited too
+        if chat_rate_limiter is not None:
+            await chat_rate_limiter.acquire(
+                sum(count_tokens(m['content']) for m in messages) + MAX_REPLY_TOKENS
+            )
+        
+        await _ai_semaphore.acquire()
+        try:
+            # the newest OpenAI model is "gpt-4o" which was released May 13, 2024.
+            # do not change this unless explicitly requested by the user
+            response = await openai_client.chat.completions.create(
+                model="gpt-4o",
+                messages=messages,
+                max_tokens=MAX_REPLY_TOKENS,
+                temperature=0.7,
+                functions=CHAT_FUNCTIONS,
+                function_call="auto",
+                # Routes requests sharing the system prompt prefix to the same prompt cache;
+                # bump SYSTEM_PROMPT_VERSION whenever SYSTEM_PROMPT changes
+                extra_body={"prompt_cache_key": f"modelforge-sysprompt-{SYSTEM_PROMPT_VERSION}-{project_id or 'none'}"},
+                **kwargs
+            )
+        except BaseException:
+            _ai_semaphore.release()
+            raise
+        
+        if not kwargs.get('stream'):
+            _ai_semaphore.release()
+        return response
+    
     def process_with_fallback(self, message: str, context: List[Dict], project_id: Optional[int] = None) -> Dict:
         """Process message using rule-based fallback"""
         
-        message_lower = message.lower()
+        tokens = tokenize_message(message)
         actions = []
         
         # Detect intent and generate response
-        if any(keyword in message_lower for keyword in ['create', 'generate', 'make', 'build']):
-            if any(keyword in message_lower for keyword in ['model', '3d', 'object', 'mesh']):
+        if tokens & CREATE_KEYWORDS:
+            if tokens & MODEL_KEYWORDS:
                 # Extract model description
                 prompt = self.extract_model_prompt(message)
-                actions.append({
-                    'type': 'generate_3d_model',
-                    'params': {'prompt': prompt, 'project_id': project_id}
-                })
-                response = f"I'll generate a 3D model: {prompt}"
+                params = {'prompt': prompt, 'project_id': project_id}
+                actions.append({'type': 'generate_3d_model', 'params': params})
+                response = describe_action('generate_3d_model', params)
                 
-            elif any(keyword in message_lower for keyword in ['script', 'code', 'lua', 'python']):
+            elif tokens & SCRIPT_KEYWORDS:
                 # Extract script description
                 prompt = self.extract_script_prompt(message)
-                script_type = self.detect_script_type(message)
-                actions.append({
-                    'type': 'generate_script',
-                    'params': {'prompt': prompt, 'script_type': script_type, 'project_id': project_id}
-                })
-                response = f"I'll generate a {script_type} script: {prompt}"
+                script_type = self.detect_script_type(message, tokens)
+                params = {'prompt': prompt, 'script_type': script_type, 'project_id': project_id}
+                actions.append({'type': 'generate_script', 'params': params})
+                response = describe_action('generate_script', params)
                 
-            elif any(keyword in message_lower for keyword in ['project', 'game', 'world']):
+            elif tokens & PROJECT_KEYWORDS:
                 # Create new project
                 name = self.extract_project_name(message)
                 description = message
-                project_type = self.detect_project_type(message)
-                actions.append({
-                    'type': 'create_project',
-                    'params': {'name': name, 'description': description, 'project_type': project_type}
-                })
-                response = f"I'll create a new {project_type} project: {name}"
+                project_type = self.detect_project_type(message, tokens)
+                params = {'name': name, 'description': description, 'project_type': project_type}
+                actions.append({'type': 'create_project', 'params': params})
+                response = describe_action('create_project', params)
                 
-            elif any(keyword in message_lower for keyword in ['world', 'level', 'map', 'environment', 'scene']):
+            elif tokens & ENVIRONMENT_KEYWORDS:
                 # Generate environment
                 prompt = message
-                actions.append({
-                    'type': 'generate_environment',
-                    'params': {'prompt': prompt, 'project_id': project_id}
-                })
-                response = f"I'll generate an environment: {prompt}"
+                params = {'prompt': prompt, 'project_id': project_id}
+                actions.append({'type': 'generate_environment', 'params': params})
+                response = describe_action('generate_environment', params)
                 
             else:
                 response = "I can help you generate 3D models, scripts, environments, or create projects. What would you like to make?"
                 
-        elif any(keyword in message_lower for keyword in ['help', 'what can you do', 'commands']):
+        elif tokens & HELP_KEYWORDS:
             response = self.get_help_response()
             
-        elif any(keyword in message_lower for keyword in ['list', 'show', 'view']):
-            if 'project' in message_lower:
+        elif tokens & LIST_KEYWORDS:
+            if 'project' in tokens:
                 response = "Here are your projects: [Project list would be shown here]"
-            elif 'model' in message_lower:
+            elif 'model' in tokens:
                 response = "Here are your generated models: [Model list would be shown here]"
             else:
                 response = "I can show you your projects, models, scripts, or environments. What would you like to see?"
@@ -226,14 +959,16 @@ class ChatHandler:
         return {
             'response': response,
             'actions': actions,
-            'meta_data': {'fallback_used': True, 'detected_intent': self.detect_intent(message)}
+            'meta_data': {'fallback_used': True, 'detected_intent': self.detect_intent(message, tokens)}
         }
     
     def handle_function_call(self, function_call, project_id: Optional[int] = None) -> Dict:
         """Handle OpenAI function calls"""
-        
-        function_name = function_call.name
-        arguments = json.loads(function_call.arguments)
+        return self.build_function_response(function_call.name, orjson.loads(function_call.arguments), project_id)
+    
+    def build_function_response(self, function_name: str, arguments: Dict,
+                                project_id: Optional[int] = None) -> Dict:
+        """Turn a function name and parsed arguments into a response with actions"""
         
         # Add project_id if not provided but available from context
         if project_id and 'project_id' not in arguments:
@@ -244,65 +979,56 @@ class ChatHandler:
             'params': arguments
         }]
         
-        # Generate appropriate response based on function
-        if function_name == 'generate_3d_model':
-            response = f"I'll generate a 3D model: {arguments['prompt']}"
-        elif function_name == 'generate_script':
-            response = f"I'll generate a {arguments['script_type']} script: {arguments['prompt']}"
-        elif function_name == 'create_project':
-            response = f"I'll create a new {arguments.get('project_type', 'general')} project: {arguments['name']}"
-        elif function_name == 'generate_environment':
-            response = f"I'll generate an environment: {arguments['prompt']}"
-        else:
-            response = f"I'll execute the {function_name} command for you."
-        
         return {
-            'response': response,
+            'response': describe_action(function_name, arguments),
             'actions': actions,
             'meta_data': {'function_called': function_name, 'ai_generated': True}
         }
     
-    def build_system_prompt(self, project_id: Optional[int] = None) -> str:
+    def build_system_prompt(self) -> str:
         """Build system prompt for AI"""
         
-        base_prompt = """You are an AI assistant that helps users create game assets and manage game development projects. You can:
-
-1. Generate 3D models from text descriptions
-2. Create scripts (Lua for Roblox, Python, C#) 
-3. Generate game environments and worlds
-4. Create and manage projects
-5. Provide guidance on game development
-
-When users ask for something to be created or generated, use the appropriate function to take action. Be helpful, creative, and provide clear explanations of what you're doing.
-
-For Roblox projects, focus on Lua scripting and Roblox-specific features.
-For Unity projects, focus on C# scripting and Unity features.
-For general projects, adapt to the user's needs.
-
-Always be encouraging and help users learn game development concepts."""
-        
-        # Add project context if available
-        if project_id:
-            # In a real implementation, you'd fetch project details
-            base_prompt += f"\n\nCurrent project context: Project ID {project_id}"
-        
-        return base_prompt
+        return SYSTEM_PROMPT
+    
+    def build_project_context(self, project_id: Optional[int] = None) -> Optional[str]:
+        """Build the per-project system message, kept apart from the cacheable base prompt"""
+        if not project_id:
+            return None
+        # In a real implementation, you'd fetch project details
+        return f"Current project context: Project ID {project_id}"
     
-    def get_conversation_context(self, session_id: str, limit: int = 10) -> List[Dict]:
-        """Get recent conversation context"""
+    async def get_conversation_context(self, session_id: str, limit: int = 50) -> List[Dict]:
+        """Get recent conversation context (message_type and content only)
+        
+        limit is only a ceiling; _build_messages trims to PROMPT_TOKEN_BUDGET.
+        """
         try:
             from models import ChatMessage
-            messages = self.db.query(ChatMessage).filter_by(session_id=session_id)\
-                .order_by(ChatMessage.created_at.desc()).limit(limit).all()
+            # Earlier turns may still be queued in the background writer
+            await message_writer.flushed(session_id)
+            query = (
+                select(ChatMessage.message_type, ChatMessage.content)
+                .where(ChatMessage.session_id == session_id)
+                .order_by(ChatMessage.created_at.desc())
+                .limit(limit)
+            )
+            # Blocking query; run it off the chat loop so other sessions keep going
+            rows = await asyncio.to_thread(self._fetch_rows, self.db.get_bind(), query)
             
-            return [msg.to_dict() for msg in reversed(messages)]
+            return [{'message_type': message_type, 'content': content}
+                    for message_type, content in reversed(rows)]
         except Exception as e:
             logging.error(f"Error getting conversation context: {e}")
             return []
     
+    @staticmethod
+    def _fetch_rows(bind, query) -> List:
+        with Session(bind) as session:
+            return session.execute(query).all()
+    
     def store_message(self, session_id: str, message_type: str, content: str, 
-                     meta_data: Optional[Dict] = None, project_id: Optional[int] = None):
-        """Store message in database"""
+                      meta_data: Optional[Dict] = None, project_id: Optional[int] = None):
+        """Queue message for the background writer; must be called on the chat loop"""
         try:
             from models import ChatMessage
             message = ChatMessage(
@@ -310,123 +1036,65 @@ Always be encouraging and help users learn game development concepts."""
                 message_type=message_type,
                 content=content,
                 meta_data=meta_data,
-                project_id=project_id
+                project_id=project_id,
+                # Stamped now rather than at insert, so a turn's messages keep their order
+                created_at=datetime.utcnow()
             )
-            self.db.add(message)
-            self.db.commit()
+            message_writer.put(self.db.get_bind(), message, session_id)
         except Exception as e:
             logging.error(f"Error storing message: {e}")
     
     def extract_model_prompt(self, message: str) -> str:
         """Extract 3D model description from message"""
         # Simple extraction - in production, use more sophisticated NLP
-        keywords = ['create', 'generate', 'make', 'build', 'model', '3d', 'object']
-        words = message.split()
-        
-        # Find where the description starts
-        start_idx = 0
-        for i, word in enumerate(words):
-            if word.lower() in keywords:
-                start_idx = i + 1
-                break
-        
-        # Take everything after the action word
-        if start_idx < len(words):
-            return ' '.join(words[start_idx:])
-        else:
-            return message
+        return _text_after_keyword(MODEL_PROMPT_PATTERN, message)
     
     def extract_script_prompt(self, message: str) -> str:
         """Extract script description from message"""
-        keywords = ['script', 'code', 'function', 'lua', 'python', 'create', 'generate', 'make']
-        words = message.split()
-        
-        start_idx = 0
-        for i, word in enumerate(words):
-            if word.lower() in keywords:
-                start_idx = i + 1
-                break
-        
-        if start_idx < len(words):
-            return ' '.join(words[start_idx:])
-        else:
-            return message
+        return _text_after_keyword(SCRIPT_PROMPT_PATTERN, message)
     
     def extract_project_name(self, message: str) -> str:
         """Extract project name from message"""
-        words = message.split()
-        
         # Look for patterns like "create project [name]" or "new game [name]"
-        for i, word in enumerate(words):
-            if word.lower() in ['project', 'game'] and i + 1 < len(words):
-                # Take next few words as name
-                name_words = []
-                for j in range(i + 1, min(i + 4, len(words))):
-                    if words[j].lower() not in ['that', 'which', 'with', 'using']:
-                        name_words.append(words[j])
-                    else:
-                        break
-                if name_words:
-                    return ' '.join(name_words)
+        for match in PROJECT_NAME_PATTERN.finditer(message):
+            # Take next few words as name
+            name_words = list(itertools.takewhile(
+                lambda word: word.lower() not in PROJECT_NAME_STOP_WORDS,
+                match.group(1).split()
+            ))
+            if name_words:
+                return ' '.join(name_words)
         
         # Fallback to generic name
-        return f"New Project {datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        return f"New Project {time.strftime('%Y%m%d_%H%M%S')}"
     
-    def detect_script_type(self, message: str) -> str:
+    def detect_script_type(self, message: str, tokens: Optional[frozenset] = None) -> str:
         """Detect script type from message"""
-        message_lower = message.lower()
-        
-        if 'lua' in message_lower or 'roblox' in message_lower:
-            return 'lua'
-        elif 'python' in message_lower:
-            return 'python'
-        elif 'c#' in message_lower or 'csharp' in message_lower or 'unity' in message_lower:
-            return 'csharp'
-        else:
-            return 'lua'  # Default to Lua for game scripting
+        tokens = tokenize_message(message) if tokens is None else tokens
+        
+        for script_type, keywords in SCRIPT_TYPE_KEYWORDS:
+            if tokens & keywords:
+                return script_type
+        return 'lua'  # Default to Lua for game scripting
     
-    def detect_project_type(self, message: str) -> str:
+    def detect_project_type(self, message: str, tokens: Optional[frozenset] = None) -> str:
         """Detect project type from message"""
-        message_lower = message.lower()
-        
-        if 'roblox' in message_lower:
-            return 'roblox'
-        elif 'unity' in message_lower:
-            return 'unity'
-        elif 'unreal' in message_lower:
-            return 'unreal'
-        else:
-            return 'general'
+        tokens = tokenize_message(message) if tokens is None else tokens
+        
+        for project_type in PROJECT_TYPES:
+            if project_type in tokens:
+                return project_type
+        return 'general'
     
-    def detect_intent(self, message: str) -> str:
+    def detect_intent(self, message: str, tokens: Optional[frozenset] = None) -> str:
         """Detect user intent from message"""
-        message_lower = message.lower()
-        
-        if any(word in message_lower for word in ['create', 'generate', 'make', 'build']):
-            return 'create'
-        elif any(word in message_lower for word in ['list', 'show', 'view', 'display']):
-            return 'list'
-        elif any(word in message_lower for word in ['help', 'how', 'what can you']):
-            return 'help'
-        elif any(word in message_lower for word in ['delete', 'remove', 'clear']):
-            return 'delete'
-        elif any(word in message_lower for word in ['edit', 'modify', 'change', 'update']):
-            return 'edit'
-        else:
-            return 'unknown'
+        tokens = tokenize_message(message) if tokens is None else tokens
+        
+        for intent, keywords in INTENT_KEYWORDS:
+            if tokens & keywords:
+                return intent
+        return 'unknown'
     
     def get_help_response(self) -> str:
         """Get help response"""
-        return """I'm your AI game development assistant! Here's what I can help you with:
-
-🎮 **Create Projects**: "Create a new Roblox RPG game" or "Start a Unity platformer project"
-
-🎯 **Generate 3D Models**: "Create a medieval sword" or "Generate a futuristic spaceship"
-
-💻 **Write Scripts**: "Create a Lua script for NPC dialogue" or "Generate Python code for inventory system"
-
-🌍 **Build Environments**: "Create a fantasy forest world" or "Generate a space station map"
-
-📋 **Manage Projects**: "List my projects" or "Show my models"
-
-Just tell me what you want to create and I'll help you build it! You can be as specific or general as you like."""
\ No newline at end of file
+        return HELP_RESPONSE
\ No newline at end of file
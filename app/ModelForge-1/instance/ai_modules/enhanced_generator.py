@@ -3,23 +3,79 @@ Enhanced AI Generation Module with YouTube Reference Support
 Implements advanced features for better Roblox-optimized model generation
 """
 
+from __future__ import annotations
+
 import os
+import re
 import json
 import hashlib
+import functools
 import logging
-import requests
+import shutil
 import subprocess
+import threading
 import numpy as np
-from typing import Dict, List, Optional, Tuple, Any
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass
 from enum import Enum
-import trimesh
 from pathlib import Path
-import cv2
-import yt_dlp
+
+# cv2, yt_dlp and trimesh are imported where they are used, so loading this
+# module for GenerationConfig and the enums stays cheap
+if TYPE_CHECKING:
+    import trimesh
+
+# decord seeks straight to sampled frames; without it we walk the video with OpenCV
+try:
+    import decord
+    DECORD_AVAILABLE = True
+except ImportError:
+    DECORD_AVAILABLE = False
+
+# meshoptimizer's C simplifier is much faster than trimesh's decimation wrapper
+try:
+    import meshoptimizer
+    MESHOPTIMIZER_AVAILABLE = True
+except ImportError:
+    MESHOPTIMIZER_AVAILABLE = False
+
+# ffmpeg on PATH lets frames be sampled and converted in one decode pass
+FFMPEG_PATH = shutil.which('ffmpeg')
 
 logger = logging.getLogger(__name__)
 
+cv2 = None
+
+def _import_cv2():
+    """Import OpenCV on first use"""
+    global cv2
+    if cv2 is None:
+        import cv2 as opencv
+        # Let OpenCV's decoder and color conversion use every core
+        opencv.setNumThreads(os.cpu_count() or 1)
+        cv2 = opencv
+    return cv2
+
+# Video ID after "v=" or a path separator; covers watch?v=, embed/ and youtu.be/ links
+YOUTUBE_ID_PATTERN = re.compile(r'(?:v=|/)([0-9A-Za-z_-]{11})')
+
+# Debug JPEG dumps of extracted frames are written off the decode path
+_jpeg_writer = ThreadPoolExecutor(max_workers=2, thread_name_prefix='frame-jpeg-writer')
+
+# Worker processes for frame decoding and LOD decimation, started on first use
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    """Shared process pool for CPU-bound frame decoding and mesh simplification"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+    return _process_pool
+
 class AssetType(Enum):
     SINGLE_OBJECT = "single_object"
     PROP_PACK = "prop_pack"
@@ -41,6 +97,46 @@ class PerformancePreset(Enum):
     HIGH_DETAIL = "high"        # 10-50k tris
     CINEMATIC = "cinematic"     # 50k+ tris
 
+# Polygon budgets per (performance preset, asset type), flattened once at import
+POLY_BUDGETS: Dict[Tuple[PerformancePreset, AssetType], int] = {
+    (performance, asset_type): budget
+    for performance, budgets in {
+        PerformancePreset.MOBILE_FRIENDLY: {
+            AssetType.SINGLE_OBJECT: 1500,
+            AssetType.PROP_PACK: 5000,
+            AssetType.ENVIRONMENT: 15000,
+            AssetType.CHARACTER: 3000,
+            AssetType.VEHICLE: 5000,
+            AssetType.WORLD: 50000
+        },
+        PerformancePreset.BALANCED: {
+            AssetType.SINGLE_OBJECT: 5000,
+            AssetType.PROP_PACK: 15000,
+            AssetType.ENVIRONMENT: 50000,
+            AssetType.CHARACTER: 10000,
+            AssetType.VEHICLE: 15000,
+            AssetType.WORLD: 150000
+        },
+        PerformancePreset.HIGH_DETAIL: {
+            AssetType.SINGLE_OBJECT: 15000,
+            AssetType.PROP_PACK: 50000,
+            AssetType.ENVIRONMENT: 150000,
+            AssetType.CHARACTER: 30000,
+            AssetType.VEHICLE: 40000,
+            AssetType.WORLD: 500000
+        },
+        PerformancePreset.CINEMATIC: {
+            AssetType.SINGLE_OBJECT: 50000,
+            AssetType.PROP_PACK: 150000,
+            AssetType.ENVIRONMENT: 500000,
+            AssetType.CHARACTER: 100000,
+            AssetType.VEHICLE: 100000,
+            AssetType.WORLD: 1500000
+        }
+    }.items()
+    for asset_type, budget in budgets.items()
+}
+
 @dataclass
 class GenerationConfig:
     """Enhanced generation configuration"""
@@ -57,70 +153,69 @@ class GenerationConfig:
     auto_rig: bool = False
     auto_texture: bool = True
     texture_resolution: int = 1024
+    frame_resolution: int = 512  # reference video frames are scaled to this square size
     use_roblox_materials: bool = True
     poly_budget: Optional[int] = None
+    export_format: str = "glb"  # binary glTF; "obj" for tools that need text meshes
+    parallel_decode: bool = False  # decode reference videos in worker processes
     
     def get_poly_budget(self) -> int:
         """Get polygon budget based on performance preset"""
-        if self.poly_budget:
-            return self.poly_budget
-            
-        budgets = {
-            PerformancePreset.MOBILE_FRIENDLY: {
-                AssetType.SINGLE_OBJECT: 1500,
-                AssetType.PROP_PACK: 5000,
-                AssetType.ENVIRONMENT: 15000,
-                AssetType.CHARACTER: 3000,
-                AssetType.VEHICLE: 5000,
-                AssetType.WORLD: 50000
-            },
-            PerformancePreset.BALANCED: {
-                AssetType.SINGLE_OBJECT: 5000,
-                AssetType.PROP_PACK: 15000,
-                AssetType.ENVIRONMENT: 50000,
-                AssetType.CHARACTER: 10000,
-                AssetType.VEHICLE: 15000,
-                AssetType.WORLD: 150000
-            },
-            PerformancePreset.HIGH_DETAIL: {
-                AssetType.SINGLE_OBJECT: 15000,
-                AssetType.PROP_PACK: 50000,
-                AssetType.ENVIRONMENT: 150000,
-                AssetType.CHARACTER: 30000,
-                AssetType.VEHICLE: 40000,
-                AssetType.WORLD: 500000
-            },
-            PerformancePreset.CINEMATIC: {
-                AssetType.SINGLE_OBJECT: 50000,
-                AssetType.PROP_PACK: 150000,
-                AssetType.ENVIRONMENT: 500000,
-                AssetType.CHARACTER: 100000,
-                AssetType.VEHICLE: 100000,
-                AssetType.WORLD: 1500000
-            }
-        }
-        
-        return budgets[self.performance][self.asset_type]
+        return self.poly_budget or POLY_BUDGETS[(self.performance, self.asset_type)]
 
 class YouTubeProcessor:
     """Extract frames and depth information from YouTube videos"""
     
-    def __init__(self, cache_dir: str = "cache/youtube_frames"):
+    # Extracted frames are cached as one array per video and frame resolution
+    FRAMES_FILE = "frames_{}.npy"
+    # Above this many frames between samples, seeking beats grabbing every frame
+    SEEK_SAMPLE_RATE = 120
+    
+    def __init__(self, cache_dir: str = "cache/youtube_frames", save_jpegs: bool = False):
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
-        
-    def extract_frames(self, url: str, max_frames: int = 30) -> List[np.ndarray]:
-        """Extract key frames from YouTube video"""
+        # Also write every sampled frame as a JPEG, for inspecting what was extracted
+        self.save_jpegs = save_jpegs
+        
+    def extract_frames(self, url: str, max_frames: int = 30, parallel_decode: bool = False,
+                       resolution: Optional[int] = None, cache: bool = True) -> np.ndarray:
+        """
+        Extract key frames from YouTube video as an (N, H, W, 3) RGB array
+        
+        With a resolution, frames are scaled to resolution x resolution while
+        decoding; otherwise they keep the video's size. Safe to call from
+        several threads for different videos. With parallel_decode the
+        decoding runs in the shared process pool; with cache=False freshly
+        extracted frames are not written to the cache.
+        """
+        cv2 = _import_cv2()
         video_id = self._get_video_id(url)
         cache_path = self.cache_dir / f"{video_id}"
         
         if cache_path.exists():
             # Load from cache
-            frames = []
-            for img_path in sorted(cache_path.glob("*.jpg"))[:max_frames]:
-                frame = cv2.imread(str(img_path))
-                frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-            return frames
+            frames_file = cache_path / self._frames_file_name(resolution)
+            if frames_file.exists():
+                return np.load(frames_file, mmap_mode='r')[:max_frames]
+                
+            # Frames cached at the video's size or a larger resolution can be scaled
+            # down; older versions cached full-size frames as one JPEG each
+            frames = None
+            source_file = self._downscalable_frames_file(cache_path, resolution)
+            if source_file is not None:
+                frames = np.load(source_file, mmap_mode='r')[:max_frames]
+            elif not any(cache_path.glob(self.FRAMES_FILE.format('*'))):
+                # JPEGs next to an array are dumps of that array, not full-size frames
+                jpegs = [cv2.imread(str(img_path)) for img_path in sorted(cache_path.glob("*.jpg"))[:max_frames]]
+                if jpegs:
+                    frames = np.stack(jpegs)[..., ::-1]
+            if frames is not None:
+                if resolution:
+                    frames = [cv2.resize(frame, (resolution, resolution), interpolation=cv2.INTER_AREA)
+                              for frame in frames]
+                return np.ascontiguousarray(frames)
+            # Nothing usable cached (an earlier download failed, caching was off, or
+            # only smaller frames were kept, which would have to be upscaled); fetch again
             
         # Download and extract
         cache_path.mkdir(exist_ok=True)
@@ -133,15 +228,21 @@ class YouTubeProcessor:
         }
         
         try:
+            import yt_dlp
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                 info = ydl.extract_info(url, download=True)
                 video_path = cache_path / f"video.{info['ext']}"
         except Exception as e:
             logger.error(f"Failed to download YouTube video: {e}")
-            return []
+            return np.empty((0, 0, 0, 3), dtype=np.uint8)
             
         # Extract frames
-        frames = self._extract_keyframes(video_path, cache_path, max_frames)
+        if parallel_decode:
+            frames = _get_process_pool().submit(
+                self._extract_keyframes, video_path, cache_path, max_frames, resolution, cache
+            ).result()
+        else:
+            frames = self._extract_keyframes(video_path, cache_path, max_frames, resolution, cache)
         
         # Clean up video file
         video_path.unlink()
@@ -150,114 +251,292 @@ class YouTubeProcessor:
         
     def _get_video_id(self, url: str) -> str:
         """Extract video ID from YouTube URL"""
-        import re
-        patterns = [
-            r'(?:v=|\/)([0-9A-Za-z_-]{11}).*',
-            r'(?:embed\/)([0-9A-Za-z_-]{11})',
-            r'(?:watch\?v=)([0-9A-Za-z_-]{11})'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, url)
-            if match:
-                return match.group(1)
+        match = YOUTUBE_ID_PATTERN.search(url)
+        if match:
+            return match.group(1)
         
         # Fallback to URL hash
-        return hashlib.md5(url.encode()).hexdigest()[:11]
-        
-    def _extract_keyframes(self, video_path: Path, output_dir: Path, max_frames: int) -> List[np.ndarray]:
+        return hashlib.blake2b(url.encode(), digest_size=6).hexdigest()[:11]
+        
+    def _frames_file_name(self, resolution: Optional[int]) -> str:
+        """Cache file for frames extracted at the given resolution"""
+        return self.FRAMES_FILE.format(resolution or 'native')
+        
+    def _downscalable_frames_file(self, cache_path: Path, resolution: Optional[int]) -> Optional[Path]:
+        """
+        Cached frames another resolution can be served from, or None
+        
+        Native-size requests need the native frames. Otherwise the smallest
+        cached resolution at or above the requested one is used, then the
+        video's own size.
+        """
+        if not resolution:
+            return None
+        larger = []
+        for path in cache_path.glob(self.FRAMES_FILE.format('*')):
+            cached_resolution = path.stem[len('frames_'):]
+            if cached_resolution.isdigit() and int(cached_resolution) >= resolution:
+                larger.append((int(cached_resolution), path))
+        if larger:
+            return min(larger)[1]
+        native_file = cache_path / self._frames_file_name(None)
+        return native_file if native_file.exists() else None
+        
+    def _cache_frames(self, output_dir: Path, frames: np.ndarray, indices, resolution: Optional[int]):
+        """Save extracted RGB frames in one file, queueing the optional JPEG dumps in the background"""
+        np.save(output_dir / self._frames_file_name(resolution), frames)
+        
+        if self.save_jpegs:
+            for index, frame in zip(indices, frames):
+                frame_path = output_dir / f"frame_{index:06d}.jpg"
+                _jpeg_writer.submit(lambda path=str(frame_path), frame=frame:
+                                    cv2.imwrite(path, cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)))
+        
+    def _extract_keyframes(self, video_path: Path, output_dir: Path, max_frames: int,
+                           resolution: Optional[int] = None, cache: bool = True) -> np.ndarray:
         """Extract keyframes using scene detection"""
-        cap = cv2.VideoCapture(str(video_path))
-        frames = []
-        frame_count = 0
+        cv2 = _import_cv2()
+        if DECORD_AVAILABLE:
+            try:
+                return self._extract_keyframes_decord(video_path, output_dir, max_frames, resolution, cache)
+            except Exception as e:
+                logger.warning(f"decord extraction failed, falling back to OpenCV: {e}")
+                
+        if FFMPEG_PATH:
+            try:
+                return self._extract_keyframes_ffmpeg(video_path, output_dir, max_frames, resolution, cache)
+            except Exception as e:
+                logger.warning(f"ffmpeg extraction failed, falling back to OpenCV: {e}")
+                
+        cap = cv2.VideoCapture(str(video_path), cv2.CAP_FFMPEG)
+        frames = None  # BGR buffer, sized from the first retrieved frame
+        indices = []
         
         # Simple uniform sampling for now
         total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
         sample_rate = max(1, total_frames // max_frames)
         
-        while cap.isOpened() and len(frames) < max_frames:
-            ret, frame = cap.read()
-            if not ret:
+        # Sparse sampling of long videos seeks; dense sampling is cheaper to step through
+        if sample_rate > self.SEEK_SAMPLE_RATE and cap.set(cv2.CAP_PROP_POS_FRAMES, 0):
+            sampled = self._seek_sampled_frames(cap, sample_rate, max_frames, total_frames)
+        else:
+            sampled = self._grab_sampled_frames(cap, sample_rate, max_frames)
+            
+        for frame_index, frame in sampled:
+            if resolution:
+                frame = cv2.resize(frame, (resolution, resolution), interpolation=cv2.INTER_AREA)
+                
+            if frames is None:
+                frames = np.empty((max_frames,) + frame.shape, dtype=np.uint8)
+            np.copyto(frames[len(indices)], frame)
+            indices.append(frame_index)
+            
+        cap.release()
+        
+        if frames is None:
+            return np.empty((0, 0, 0, 3), dtype=np.uint8)
+        # One channel flip for the whole batch instead of a cvtColor call per frame
+        frames = np.ascontiguousarray(frames[:len(indices), ..., ::-1])
+        if cache:
+            self._cache_frames(output_dir, frames, indices, resolution)
+        return frames
+        
+    def _grab_sampled_frames(self, cap, sample_rate: int, max_frames: int):
+        """Step through the video, yielding (index, BGR frame) for every sample_rate-th frame"""
+        frame_count = 0
+        kept = 0
+        while cap.isOpened() and kept < max_frames:
+            # grab() only advances the stream; skipped frames are never converted to images
+            if not cap.grab():
                 break
                 
             if frame_count % sample_rate == 0:
-                # Save frame
-                frame_path = output_dir / f"frame_{frame_count:06d}.jpg"
-                cv2.imwrite(str(frame_path), frame)
-                frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+                ret, frame = cap.retrieve()
+                if not ret:
+                    break
+                yield frame_count, frame
+                kept += 1
                 
             frame_count += 1
             
+    def _seek_sampled_frames(self, cap, sample_rate: int, max_frames: int, total_frames: int):
+        """
+        Seek to each sampled index instead of stepping through the frames in between
+        
+        OpenCV seeks to the preceding keyframe and decodes forward from there.
+        Containers without a reliable frame index (e.g. VP9 in WebM) may land
+        a few frames off.
+        """
+        for frame_index in range(0, min(total_frames, sample_rate * max_frames), sample_rate):
+            if not cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index):
+                break
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield frame_index, frame
+            
+    def _extract_keyframes_ffmpeg(self, video_path: Path, output_dir: Path, max_frames: int,
+                                  resolution: Optional[int] = None, cache: bool = True) -> np.ndarray:
+        """Let ffmpeg select the sampled frames and pipe them out as raw RGB into one buffer"""
+        cv2 = _import_cv2()
+        # The container header is enough for the frame size and count
+        cap = cv2.VideoCapture(str(video_path), cv2.CAP_FFMPEG)
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
         cap.release()
+        if not width or not height:
+            raise ValueError(f"Could not read frame size of {video_path}")
+            
+        sample_rate = max(1, total_frames // max_frames)
+        video_filter = f"select='not(mod(n\\,{sample_rate}))'"
+        if resolution:
+            # Scaling inside the decode pipeline avoids copying full-size frames out
+            video_filter += f",scale={resolution}:{resolution}:flags=area"
+            width = height = resolution
+        command = [
+            FFMPEG_PATH, '-v', 'error', '-i', str(video_path),
+            '-vf', video_filter, '-vsync', '0',
+            '-frames:v', str(max_frames),
+            '-pix_fmt', 'rgb24', '-f', 'rawvideo', '-'
+        ]
+        
+        frames = np.empty((max_frames, height, width, 3), dtype=np.uint8)
+        with subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE) as proc:
+            read = proc.stdout.readinto(memoryview(frames).cast('B'))
+            _, stderr = proc.communicate()
+        kept = read // (height * width * 3)
+        if proc.returncode != 0 and kept == 0:
+            raise RuntimeError(stderr.decode(errors='replace').strip())
+            
+        frames = frames[:kept]
+        if cache:
+            self._cache_frames(output_dir, frames, range(0, kept * sample_rate, sample_rate), resolution)
         return frames
+        
+    def _extract_keyframes_decord(self, video_path: Path, output_dir: Path, max_frames: int,
+                                  resolution: Optional[int] = None, cache: bool = True) -> np.ndarray:
+        """Decode only the sampled frames, seeking through the container's index"""
+        # -1 keeps the video's own size
+        size = {'width': resolution or -1, 'height': resolution or -1}
+        try:
+            # Only succeeds on CUDA-enabled decord builds
+            reader = decord.VideoReader(str(video_path), ctx=decord.gpu(0), **size)
+        except Exception:
+            reader = decord.VideoReader(str(video_path), ctx=decord.cpu(0), num_threads=os.cpu_count() or 1, **size)
+            
+        # Same fixed stride as the OpenCV and ffmpeg paths, so every backend
+        # picks (and caches) the same frames
+        total_frames = len(reader)
+        sample_rate = max(1, total_frames // max_frames)
+        indices = np.arange(0, min(total_frames, sample_rate * max_frames), sample_rate)
+        batch = reader.get_batch(indices).asnumpy()  # already RGB
+        
+        if cache:
+            self._cache_frames(output_dir, batch, indices, resolution)
+        return batch
+
+# Prompt fragments added by PromptEnhancer
+STYLE_MODIFIERS = {
+    StyleFilter.REALISTIC: "photorealistic, high detail, PBR materials",
+    StyleFilter.ROBLOX_CARTOONY: "stylized cartoon, smooth surfaces, bright colors, Roblox style",
+    StyleFilter.VOXEL: "voxel art, cubic shapes, minecraft style, blocky",
+    StyleFilter.ANIME: "anime style, cel shaded, vibrant colors",
+    StyleFilter.LOW_POLY: "low poly, flat shaded, geometric, minimal detail"
+}
+
+ASSET_TYPE_MODIFIERS = {
+    AssetType.SINGLE_OBJECT: "single isolated object, centered, no background",
+    AssetType.PROP_PACK: "collection of related props, modular pieces",
+    AssetType.ENVIRONMENT: "complete environment, room scale, architectural",
+    AssetType.CHARACTER: "character model, T-pose, symmetrical, riggable",
+    AssetType.VEHICLE: "vehicle, separate wheels, functional parts",
+    AssetType.WORLD: "large scale world, terrain, multiple areas"
+}
+
+@functools.lru_cache(maxsize=1024)
+def _enhance_prompt(prompt: str, style: StyleFilter, asset_type: AssetType, poly_budget: int) -> str:
+    """Join the prompt with its style, budget, Roblox and asset type constraints"""
+    parts = [
+        prompt,
+        STYLE_MODIFIERS[style],
+        # Add performance constraints
+        f"optimized for games, maximum {poly_budget} polygons",
+        # Add Roblox-specific constraints
+        "exterior only, no interior details, simple clean geometry",
+        "suitable for Roblox, game asset, no unnecessary complexity",
+    ]
+    if asset_type in ASSET_TYPE_MODIFIERS:
+        parts.append(ASSET_TYPE_MODIFIERS[asset_type])
+    return ", ".join(parts)
 
 class PromptEnhancer:
     """Enhance prompts with style and optimization constraints"""
     
     def enhance(self, prompt: str, config: GenerationConfig) -> str:
         """Enhance prompt with style and technical constraints"""
-        
-        # Base enhancements
-        enhanced = prompt
-        
-        # Add style modifiers
-        style_modifiers = {
-            StyleFilter.REALISTIC: "photorealistic, high detail, PBR materials",
-            StyleFilter.ROBLOX_CARTOONY: "stylized cartoon, smooth surfaces, bright colors, Roblox style",
-            StyleFilter.VOXEL: "voxel art, cubic shapes, minecraft style, blocky",
-            StyleFilter.ANIME: "anime style, cel shaded, vibrant colors",
-            StyleFilter.LOW_POLY: "low poly, flat shaded, geometric, minimal detail"
-        }
-        
-        enhanced += f", {style_modifiers[config.style]}"
-        
-        # Add performance constraints
-        poly_budget = config.get_poly_budget()
-        enhanced += f", optimized for games, maximum {poly_budget} polygons"
-        
-        # Add Roblox-specific constraints
-        enhanced += ", exterior only, no interior details, simple clean geometry"
-        enhanced += ", suitable for Roblox, game asset, no unnecessary complexity"
-        
-        # Add asset type specifics
-        if config.asset_type == AssetType.SINGLE_OBJECT:
-            enhanced += ", single isolated object, centered, no background"
-        elif config.asset_type == AssetType.PROP_PACK:
-            enhanced += ", collection of related props, modular pieces"
-        elif config.asset_type == AssetType.ENVIRONMENT:
-            enhanced += ", complete environment, room scale, architectural"
-        elif config.asset_type == AssetType.CHARACTER:
-            enhanced += ", character model, T-pose, symmetrical, riggable"
-        elif config.asset_type == AssetType.VEHICLE:
-            enhanced += ", vehicle, separate wheels, functional parts"
-        elif config.asset_type == AssetType.WORLD:
-            enhanced += ", large scale world, terrain, multiple areas"
-            
-        return enhanced
+        return _enhance_prompt(prompt, config.style, config.asset_type, config.get_poly_budget())
+
+def _decimate(vertices: np.ndarray, faces: np.ndarray, target_faces: int,
+              target_error: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Quadric-simplify a mesh given as arrays; module level so pool workers can run it"""
+    if MESHOPTIMIZER_AVAILABLE:
+        # meshoptimizer works on a flat index buffer
+        indices = np.ascontiguousarray(faces, dtype=np.uint32).ravel()
+        destination = np.empty_like(indices)
+        index_count = meshoptimizer.simplify(
+            destination, indices, np.ascontiguousarray(vertices, dtype=np.float32),
+            target_index_count=target_faces * 3,
+            target_error=target_error
+        )
+        
+        # Keep only the vertices the simplified faces still use
+        used, remapped = np.unique(destination[:index_count], return_inverse=True)
+        return vertices[used], remapped.reshape(-1, 3)
+        
+    # Use quadric decimation for better quality
+    import trimesh
+    simplified = trimesh.Trimesh(vertices=vertices, faces=faces, process=False)
+    simplified = simplified.simplify_quadric_decimation(face_count=target_faces)
+    return simplified.vertices.view(np.ndarray), simplified.faces.view(np.ndarray)
 
 class LODGenerator:
     """Generate multiple LOD levels for models"""
     
+    # Simplification error budget, relative to the mesh extents
+    TARGET_ERROR = 0.05
+    # Smaller meshes decimate faster than they can be shipped to worker processes
+    MIN_FACES_FOR_PARALLEL = 5000
+    
     def generate_lods(self, mesh: trimesh.Trimesh, levels: int = 3) -> List[trimesh.Trimesh]:
-        """Generate LOD levels with progressive decimation"""
-        lods = [mesh.copy()]  # LOD0 is original
+        """
+        Generate LOD levels with progressive decimation
+        
+        LOD0 is the input mesh itself, not a copy; callers must not mutate it.
+        """
+        import trimesh
+        lods = [mesh]
         
         # Calculate decimation ratios
         ratios = np.linspace(0.5, 0.1, levels - 1)
-        
-        for ratio in ratios:
-            target_faces = int(len(mesh.faces) * ratio)
-            if target_faces < 10:
-                target_faces = 10
-                
-            try:
-                # Use quadric decimation for better quality
-                simplified = mesh.simplify_quadric_decimation(target_faces)
-                lods.append(simplified)
-            except:
-                # Fallback to basic simplification
-                simplified = mesh.simplify_quadric(target_faces)
-                lods.append(simplified)
+        target_counts = np.maximum((len(mesh.faces) * ratios).astype(int), 10)
+        # Small meshes can round several ratios to the same face count
+        target_counts = [int(target) for target in dict.fromkeys(target_counts)]
+        
+        # Every level decimates the original independently, so levels can run in parallel
+        args = (
+            repeat(mesh.vertices.view(np.ndarray)),
+            repeat(mesh.faces.view(np.ndarray)),
+            target_counts,
+            repeat(self.TARGET_ERROR)
+        )
+        if len(target_counts) > 1 and len(mesh.faces) >= self.MIN_FACES_FOR_PARALLEL:
+            results = _get_process_pool().map(_decimate, *args)
+        else:
+            results = map(_decimate, *args)
+            
+        for vertices, faces in results:
+            lods.append(trimesh.Trimesh(vertices=vertices, faces=faces, process=False))
                 
         return lods
         
@@ -280,32 +559,38 @@ class LODGenerator:
 class VariationGenerator:
     """Generate variations of models"""
     
+    def __init__(self, seed: Optional[int] = None):
+        # One PCG64 generator for every call; pass a seed for reproducible variations
+        self._rng = np.random.default_rng(seed)
+        
     def generate_variations(self, base_mesh: trimesh.Trimesh, count: int = 5) -> List[trimesh.Trimesh]:
         """Generate variations with different parameters"""
-        variations = []
-        
-        for i in range(count):
-            variant = base_mesh.copy()
-            
-            # Random scale variation (0.8x to 1.2x)
-            scale = np.random.uniform(0.8, 1.2, 3)
-            variant.apply_scale(scale)
-            
-            # Slight rotation for variety
-            angle = np.random.uniform(-15, 15)
-            rotation = trimesh.transformations.rotation_matrix(
-                np.radians(angle), [0, 1, 0]
-            )
-            variant.apply_transform(rotation)
-            
-            # Add noise for organic variation (small amount)
-            if i % 2 == 0:
-                noise = np.random.normal(0, 0.01, variant.vertices.shape)
-                variant.vertices += noise
-                
-            variations.append(variant)
-            
-        return variations
+        import trimesh
+        rng = self._rng
+        
+        # Draw every variation's parameters up front
+        scales = rng.uniform(0.8, 1.2, (count, 3))  # 0.8x to 1.2x per axis
+        angles = np.radians(rng.uniform(-15, 15, count))  # slight rotation about Y
+        
+        # Per-variation scale-then-rotate matrices, applied in one batched product
+        cos, sin = np.cos(angles), np.sin(angles)
+        rotations = np.zeros((count, 3, 3))
+        rotations[:, 0, 0] = cos
+        rotations[:, 0, 2] = sin
+        rotations[:, 1, 1] = 1
+        rotations[:, 2, 0] = -sin
+        rotations[:, 2, 2] = cos
+        transforms = rotations * scales[:, None, :]
+        vertices = np.einsum('vj,nij->nvi', base_mesh.vertices, transforms)
+        
+        # Add noise for organic variation (small amount) to every other variation
+        vertices[::2] += rng.normal(0, 0.01, vertices[::2].shape)
+        
+        # Variants share the base face array; only the vertices differ
+        return [
+            trimesh.Trimesh(vertices=variant_vertices, faces=base_mesh.faces, process=False, validate=False)
+            for variant_vertices in vertices
+        ]
 
 class EnhancedModelGenerator:
     """Main enhanced generation pipeline"""
@@ -326,10 +611,18 @@ class EnhancedModelGenerator:
         reference_data = {}
         if config.youtube_urls:
             logger.info(f"Extracting frames from {len(config.youtube_urls)} YouTube videos")
+            # Download and decode the videos concurrently, once per distinct URL
+            urls = list(dict.fromkeys(config.youtube_urls))
+            with ThreadPoolExecutor(max_workers=min(8, len(urls))) as executor:
+                frames_by_url = dict(zip(urls, executor.map(
+                    lambda url: self.youtube_processor.extract_frames(
+                        url, parallel_decode=config.parallel_decode, resolution=config.frame_resolution
+                    ),
+                    urls
+                )))
             all_frames = []
             for url in config.youtube_urls:
-                frames = self.youtube_processor.extract_frames(url)
-                all_frames.extend(frames)
+                all_frames.extend(frames_by_url[url])
             reference_data['frames'] = all_frames
             
         # Enhance prompt
@@ -367,42 +660,47 @@ class EnhancedModelGenerator:
         """Generate the base model (placeholder implementation)"""
         # This would integrate with your existing AI generation
         # For now, create a simple procedural model as example
+        import trimesh
         
+        # Primitives come out clean, so skip validation. Box and icosphere are built
+        # unprocessed; the capsule keeps processing so its revolve seam is merged watertight
         if config.asset_type == AssetType.SINGLE_OBJECT:
             # Simple box as placeholder
-            mesh = trimesh.creation.box(extents=[1, 1, 1])
+            mesh = trimesh.creation.box(extents=[1, 1, 1], validate=False)
         elif config.asset_type == AssetType.CHARACTER:
             # Simple capsule for character
-            mesh = trimesh.creation.capsule(height=2, radius=0.5)
+            mesh = trimesh.creation.capsule(height=2, radius=0.5, validate=False)
         else:
             # Default sphere
-            mesh = trimesh.creation.icosphere(subdivisions=2, radius=1)
+            mesh = trimesh.creation.icosphere(subdivisions=2, radius=1, process=False, validate=False)
             
         # Apply poly budget
         target_faces = config.get_poly_budget() // 2
         if len(mesh.faces) > target_faces:
-            mesh = mesh.simplify_quadric_decimation(target_faces)
+            mesh = mesh.simplify_quadric_decimation(face_count=target_faces)
             
         return mesh
         
     def _save_outputs(self, base_mesh: trimesh.Trimesh, lods: List, variations: List, config: GenerationConfig) -> Dict:
         """Save all generated outputs"""
-        timestamp = hashlib.md5(config.prompt.encode()).hexdigest()[:8]
+        timestamp = hashlib.blake2b(config.prompt.encode(), digest_size=4).hexdigest()
         base_name = f"{config.asset_type.value}_{timestamp}"
         
         output_data = {}
+        exports = []  # (path, mesh) pairs, written together below
         
         # Save base model
-        base_path = self.output_dir / f"{base_name}.obj"
-        base_mesh.export(base_path)
+        extension = config.export_format
+        base_path = self.output_dir / f"{base_name}.{extension}"
+        exports.append((base_path, base_mesh))
         output_data['base'] = str(base_path)
         
         # Save LODs
         if lods:
             lod_paths = []
             for i, lod in enumerate(lods):
-                lod_path = self.output_dir / f"{base_name}_LOD{i}.obj"
-                lod.export(lod_path)
+                lod_path = self.output_dir / f"{base_name}_LOD{i}.{extension}"
+                exports.append((lod_path, lod))
                 lod_paths.append(str(lod_path))
             output_data['lods'] = lod_paths
             
@@ -410,11 +708,19 @@ class EnhancedModelGenerator:
         if variations:
             var_paths = []
             for i, var in enumerate(variations):
-                var_path = self.output_dir / f"{base_name}_var{i}.obj"
-                var.export(var_path)
+                var_path = self.output_dir / f"{base_name}_var{i}.{extension}"
+                exports.append((var_path, var))
                 var_paths.append(str(var_path))
             output_data['variations'] = var_paths
             
+        # Engines consume fp32 positions: GLB already stores float32/uint32 buffers,
+        # and OBJ text needs no more digits than a float32 holds
+        export_options = {'digits': 6} if extension == 'obj' else {}
+        
+        # Overlap the file writes of independent exports
+        with ThreadPoolExecutor(max_workers=min(8, len(exports))) as executor:
+            list(executor.map(lambda job: job[1].export(job[0], file_type=extension, **export_options), exports))
+            
         # Save metadata
         metadata = {
             'config': config.__dict__,
@@ -1,187 +1,345 @@
 import os
+import copy
+import functools
+import base64
 import logging
 import json
-import random
+import re
+import numpy as np
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple
 
-def generate_environment(prompt: str, size: Tuple[int, int] = (100, 100)) -> Dict:
+# Keywords that identify each environment type, in priority order
+ENVIRONMENT_TYPES = {
+    'village': ['village', 'town', 'city', 'settlement'],
+    'forest': ['forest', 'woods', 'trees', 'jungle'],
+    'desert': ['desert', 'sand', 'dunes', 'oasis'],
+    'mountain': ['mountain', 'hills', 'peaks', 'cliffs'],
+    'beach': ['beach', 'ocean', 'sea', 'coast', 'shore'],
+    'cave': ['cave', 'cavern', 'underground', 'dungeon'],
+    'space': ['space', 'alien', 'sci-fi', 'futuristic'],
+    'medieval': ['medieval', 'castle', 'kingdom', 'fantasy'],
+}
+ENVIRONMENT_KEYWORDS = {word: env_type for env_type, words in ENVIRONMENT_TYPES.items() for word in words}
+# Longest keywords first so e.g. 'cavern' is not consumed as 'cave'
+ENVIRONMENT_KEYWORD_PATTERN = re.compile(
+    '|'.join(re.escape(word) for word in sorted(ENVIRONMENT_KEYWORDS, key=len, reverse=True))
+)
+
+# Terrain grids are built on a worker while structures are placed; the
+# NumPy work releases the GIL so the two overlap
+_terrain_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='terrain')
+
+# Terrain materials, stored per cell as an index into this palette
+MATERIAL_PALETTE = ('Grass', 'Rock', 'Sand', 'Water', 'LeafyGrass')
+MATERIAL_GRASS, MATERIAL_ROCK, MATERIAL_SAND, MATERIAL_WATER, MATERIAL_LEAFY_GRASS = range(len(MATERIAL_PALETTE))
+
+# Random pools for placed structures and spawns
+VILLAGE_HOUSE_TYPES = ('House', 'Cottage', 'Shop')
+TREE_TYPES = ('Oak', 'Pine', 'Birch', 'Willow')
+CAVE_FEATURE_TYPES = ('Stalactite', 'Stalagmite', 'CrystalFormation')
+CAVE_ENEMY_TYPES = ('Skeleton', 'Spider', 'Bat')
+FOREST_ENEMY_TYPES = ('Wolf', 'Bear', 'Bandit')
+
+def choose(rng: np.random.Generator, pool: Tuple[str, ...], count: int) -> List[str]:
+    """Draw count items from pool (with replacement) in one RNG call"""
+    return [pool[i] for i in rng.integers(len(pool), size=count).tolist()]
+
+def generate_environment(prompt: str, size: Tuple[int, int] = (100, 100), seed: Optional[int] = None) -> Dict:
     """
     Generate environment/world layout based on natural language description
     
     Args:
         prompt: Description of the desired environment
         size: World size (width, height) in grid units
+        seed: Optional RNG seed; seeded environments are deterministic and
+            repeated requests are served from a cache
     
     Returns:
         Dictionary containing environment data
     """
     try:
-        prompt_lower = prompt.lower()
-        
-        # Determine environment type
-        env_type = detect_environment_type(prompt_lower)
-        
-        # Generate base terrain
-        terrain = generate_terrain(env_type, size)
-        
-        # Place structures and objects
-        structures = place_structures(prompt_lower, env_type, size)
-        
-        # Generate spawn points
-        spawn_points = generate_spawn_points(env_type, size, structures)
-        
-        # Create lighting and atmosphere
-        atmosphere = generate_atmosphere(env_type)
-        
-        # Generate paths/roads
-        paths = generate_paths(structures, size)
-        
-        environment_data = {
-            "type": env_type,
-            "size": size,
-            "terrain": terrain,
-            "structures": structures,
-            "spawn_points": spawn_points,
-            "atmosphere": atmosphere,
-            "paths": paths,
-            "metadata": {
-                "prompt": prompt,
-                "version": "1.0"
-            }
-        }
-        
-        return environment_data
+        if seed is None:
+            return _build_environment(prompt, size, None)
+        # Callers own (and may mutate) what they get back, so hand out copies
+        return copy.deepcopy(_build_cached_environment(prompt, tuple(size), seed))
         
     except Exception as e:
         logging.error(f"Error generating environment: {e}")
         return generate_fallback_environment(size)
 
+@functools.lru_cache(maxsize=128)
+def _build_cached_environment(prompt: str, size: Tuple[int, int], seed: int) -> Dict:
+    return _build_environment(prompt, size, seed)
+
+def _build_environment(prompt: str, size: Tuple[int, int], seed: Optional[int]) -> Dict:
+    prompt_lower = prompt.lower()
+    
+    # Independent streams for the terrain worker and the layout passes
+    terrain_seed, layout_seed = np.random.SeedSequence(seed).spawn(2)
+    rng = np.random.default_rng(layout_seed)
+    
+    # Determine environment type
+    env_type = detect_environment_type(prompt_lower)
+    
+    # Generate base terrain in the background; nothing else depends on it
+    terrain_future = _terrain_executor.submit(
+        generate_terrain, env_type, size, np.random.default_rng(terrain_seed)
+    )
+    
+    # Place structures and objects
+    structures = place_structures(prompt_lower, env_type, size, rng)
+    
+    # Generate spawn points
+    spawn_points = generate_spawn_points(env_type, size, structures, rng)
+    
+    # Create lighting and atmosphere
+    atmosphere = generate_atmosphere(env_type)
+    
+    # Generate paths/roads
+    paths = generate_paths(structures, size)
+    
+    terrain = terrain_future.result()
+    
+    return {
+        "type": env_type,
+        "size": size,
+        "terrain": terrain,
+        "structures": structures.to_list(),
+        "spawn_points": spawn_points,
+        "atmosphere": atmosphere,
+        "paths": paths,
+        "metadata": {
+            "prompt": prompt,
+            "seed": seed,
+            "version": "1.2"
+        }
+    }
+
+@functools.lru_cache(maxsize=256)
 def detect_environment_type(prompt: str) -> str:
     """Detect the type of environment from the prompt"""
-    if any(word in prompt for word in ['village', 'town', 'city', 'settlement']):
-        return 'village'
-    elif any(word in prompt for word in ['forest', 'woods', 'trees', 'jungle']):
-        return 'forest'
-    elif any(word in prompt for word in ['desert', 'sand', 'dunes', 'oasis']):
-        return 'desert'
-    elif any(word in prompt for word in ['mountain', 'hills', 'peaks', 'cliffs']):
-        return 'mountain'
-    elif any(word in prompt for word in ['beach', 'ocean', 'sea', 'coast', 'shore']):
-        return 'beach'
-    elif any(word in prompt for word in ['cave', 'cavern', 'underground', 'dungeon']):
-        return 'cave'
-    elif any(word in prompt for word in ['space', 'alien', 'sci-fi', 'futuristic']):
-        return 'space'
-    elif any(word in prompt for word in ['medieval', 'castle', 'kingdom', 'fantasy']):
-        return 'medieval'
-    else:
-        return 'plains'
+    found = {ENVIRONMENT_KEYWORDS[match] for match in ENVIRONMENT_KEYWORD_PATTERN.findall(prompt)}
+    # Earlier environment types take priority when several are mentioned
+    for env_type in ENVIRONMENT_TYPES:
+        if env_type in found:
+            return env_type
+    return 'plains'
 
-def generate_terrain(env_type: str, size: Tuple[int, int]) -> Dict:
+def generate_terrain(env_type: str, size: Tuple[int, int], rng: Optional[np.random.Generator] = None) -> Dict:
     """Generate terrain data based on environment type"""
-    width, height = size
+    rng = rng if rng is not None else np.random.default_rng()
+    
+    # Heights and material indices for the whole grid, from the type's generator
+    generate_grid = TERRAIN_GENERATORS.get(env_type, _plains_terrain)
+    height_val, materials = generate_grid(size, rng)
+    np.maximum(height_val, 0, out=height_val)
+    
     terrain = {
         "type": env_type,
-        "heightmap": [],
-        "materials": [],
+        "heightmap": encode_heightmap(height_val),
+        "materials": encode_materials(materials),
         "features": []
     }
     
-    # Generate heightmap
-    for y in range(height):
-        row = []
-        material_row = []
-        for x in range(width):
-            # Generate height based on environment type
-            if env_type == 'mountain':
-                # Higher in center, lower at edges
-                center_dist = ((x - width//2)**2 + (y - height//2)**2)**0.5
-                max_dist = (width//2**2 + height//2**2)**0.5
-                height_val = max(0, 1 - center_dist/max_dist) * 50 + random.uniform(-2, 2)
-                material = 'Rock' if height_val > 30 else 'Grass'
-            elif env_type == 'desert':
-                # Rolling dunes
-                height_val = abs(random.gauss(5, 3)) + 2
-                material = 'Sand'
-            elif env_type == 'beach':
-                # Gradual slope towards water
-                if x < width * 0.3:
-                    height_val = random.uniform(0, 1)  # Water level
-                    material = 'Water'
-                elif x < width * 0.5:
-                    height_val = random.uniform(1, 3)  # Beach
-                    material = 'Sand'
-                else:
-                    height_val = random.uniform(3, 8)  # Land
-                    material = 'Grass'
-            elif env_type == 'cave':
-                # Mostly flat with some variation
-                height_val = random.uniform(0, 2)
-                material = 'Rock'
-            else:  # plains, forest, village, medieval
-                # Gentle rolling hills
-                height_val = random.uniform(0, 5) + random.gauss(0, 1)
-                if env_type == 'forest':
-                    material = 'Grass' if random.random() > 0.3 else 'LeafyGrass'
-                else:
-                    material = 'Grass'
-            
-            row.append(max(0, height_val))
-            material_row.append(material)
-        
-        terrain["heightmap"].append(row)
-        terrain["materials"].append(material_row)
-    
     # Add terrain features
-    if env_type == 'mountain':
-        terrain["features"].extend(generate_mountain_features(size))
-    elif env_type == 'forest':
-        terrain["features"].extend(generate_forest_features(size))
-    elif env_type == 'desert':
-        terrain["features"].extend(generate_desert_features(size))
-    elif env_type == 'beach':
-        terrain["features"].extend(generate_beach_features(size))
+    generate_features = TERRAIN_FEATURE_GENERATORS.get(env_type)
+    if generate_features:
+        terrain["features"].extend(generate_features(size, rng))
     
     return terrain
 
-def place_structures(prompt: str, env_type: str, size: Tuple[int, int]) -> List[Dict]:
+# Per-type terrain generators: (size, rng) -> (heights, material indices).
+# Each updates its arrays in place so it makes as few passes over the grid as possible.
+
+def _mountain_terrain(size: Tuple[int, int], rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+    # Higher in center, lower at edges
+    width, height = size
+    yy, xx = np.ogrid[:height, :width]
+    center_dist = np.sqrt((xx - width//2)**2 + (yy - height//2)**2)
+    max_dist = (width//2**2 + height//2**2)**0.5
+    height_val = rng.uniform(-2, 2, (height, width))
+    height_val += np.clip(1 - center_dist/max_dist, 0, None) * 50
+    return height_val, np.where(height_val > 30, MATERIAL_ROCK, MATERIAL_GRASS).astype(np.uint8)
+
+def _desert_terrain(size: Tuple[int, int], rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+    # Rolling dunes
+    shape = (size[1], size[0])
+    height_val = rng.normal(5, 3, shape)
+    np.abs(height_val, out=height_val)
+    height_val += 2
+    return height_val, np.full(shape, MATERIAL_SAND, dtype=np.uint8)
+
+def _beach_terrain(size: Tuple[int, int], rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+    # Gradual slope towards water: water level, beach, then land, by column
+    width, height = size
+    columns = np.arange(width)
+    water = columns < width * 0.3
+    sand = ~water & (columns < width * 0.5)
+    low = np.select([water, sand], [0.0, 1.0], 3.0)
+    span = np.select([water, sand], [1.0, 2.0], 5.0)
+    height_val = rng.random((height, width))
+    height_val *= span
+    height_val += low
+    materials = np.select([water, sand], [MATERIAL_WATER, MATERIAL_SAND], MATERIAL_GRASS).astype(np.uint8)
+    return height_val, np.broadcast_to(materials, (height, width))
+
+def _cave_terrain(size: Tuple[int, int], rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+    # Mostly flat with some variation
+    shape = (size[1], size[0])
+    return rng.uniform(0, 2, shape), np.full(shape, MATERIAL_ROCK, dtype=np.uint8)
+
+def _plains_terrain(size: Tuple[int, int], rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+    # Gentle rolling hills (plains, village, medieval, space)
+    shape = (size[1], size[0])
+    height_val = rng.standard_normal(shape)
+    height_val += rng.uniform(0, 5, shape)
+    return height_val, np.full(shape, MATERIAL_GRASS, dtype=np.uint8)
+
+def _forest_terrain(size: Tuple[int, int], rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+    # Rolling hills with patches of leafy ground
+    height_val, _ = _plains_terrain(size, rng)
+    materials = np.where(rng.random(height_val.shape) > 0.3, MATERIAL_GRASS, MATERIAL_LEAFY_GRASS).astype(np.uint8)
+    return height_val, materials
+
+def encode_heightmap(heights: np.ndarray) -> Dict:
+    """
+    Quantize a heightmap to uint8 and base64 encode it for the JSON payload
+    
+    Heights are scaled so the tallest cell maps to 255; decode with
+    decode_heightmap().
+    """
+    peak = float(heights.max()) if heights.size else 0.0
+    scale = peak / 255 if peak > 0 else 1.0
+    quantized = np.rint(heights / scale).clip(0, 255).astype(np.uint8)
+    return {
+        "encoding": "uint8-base64",
+        "shape": list(heights.shape),
+        "scale": scale,
+        "data": base64.b64encode(quantized.tobytes()).decode('ascii')
+    }
+
+def decode_heightmap(heightmap: Dict) -> np.ndarray:
+    """Decode a heightmap produced by encode_heightmap() into a float32 (height, width) array"""
+    quantized = np.frombuffer(base64.b64decode(heightmap["data"]), dtype=np.uint8)
+    return quantized.reshape(heightmap["shape"]).astype(np.float32) * heightmap["scale"]
+
+def encode_materials(materials: np.ndarray) -> Dict:
+    """Base64 encode a (height, width) grid of MATERIAL_PALETTE indices"""
+    return {
+        "encoding": "uint8-base64",
+        "shape": list(materials.shape),
+        "palette": list(MATERIAL_PALETTE),
+        "data": base64.b64encode(np.ascontiguousarray(materials, dtype=np.uint8).tobytes()).decode('ascii')
+    }
+
+def decode_materials(materials: Dict) -> np.ndarray:
+    """Decode a material grid produced by encode_materials() into an array of material names"""
+    indices = np.frombuffer(base64.b64decode(materials["data"]), dtype=np.uint8)
+    return np.asarray(materials["palette"])[indices].reshape(materials["shape"])
+
+class StructureBuffer:
+    """
+    Structure-of-arrays store for placed structures.
+    
+    Generators append into parallel type/position/footprint columns so later
+    passes (paths, spawn points) can filter and read positions with NumPy;
+    structure dicts are only built by to_list() at the API boundary.
+    """
+    
+    def __init__(self):
+        self.types: List[str] = []
+        self.xs = array('i')
+        self.ys = array('i')
+        self.widths = array('i')
+        self.heights = array('i')
+        self.segments: List[Dict] = []
+    
+    def __len__(self) -> int:
+        return len(self.types)
+    
+    def add(self, structure_type: str, x: int, y: int, size: Tuple[int, int] = (4, 4)):
+        """Append a single structure"""
+        self.types.append(structure_type)
+        self.xs.append(x)
+        self.ys.append(y)
+        self.widths.append(size[0])
+        self.heights.append(size[1])
+    
+    def extend(self, types: List[str], xs: List[int], ys: List[int], widths, heights):
+        """Append a batch of structures; widths/heights may be a scalar or per-structure"""
+        count = len(types)
+        self.types.extend(types)
+        self.xs.extend(xs)
+        self.ys.extend(ys)
+        self.widths.extend([widths] * count if isinstance(widths, int) else widths)
+        self.heights.extend([heights] * count if isinstance(heights, int) else heights)
+    
+    def add_segment(self, wall_type: str, start: Tuple[int, int], end: Tuple[int, int]):
+        """Append a straight run of wall tiles"""
+        self.segments.append(create_wall_segment(wall_type, start, end))
+    
+    def mask(self, structure_types) -> np.ndarray:
+        """Boolean mask of structures whose type is in structure_types"""
+        return np.fromiter((t in structure_types for t in self.types), dtype=bool, count=len(self.types))
+    
+    def positions(self, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """(N, 2) array of structure positions, optionally filtered by a mask"""
+        xs = np.frombuffer(self.xs, dtype=np.int32) if self.xs else np.empty(0, dtype=np.int32)
+        ys = np.frombuffer(self.ys, dtype=np.int32) if self.ys else np.empty(0, dtype=np.int32)
+        if mask is not None:
+            xs, ys = xs[mask], ys[mask]
+        return np.column_stack((xs, ys))
+    
+    def to_list(self) -> List[Dict]:
+        """Convert to the JSON structure list"""
+        structures = [
+            create_structure(structure_type, x, y, size=(w, h))
+            for structure_type, x, y, w, h in zip(self.types, self.xs, self.ys, self.widths, self.heights)
+        ]
+        structures.extend(self.segments)
+        return structures
+
+def place_structures(prompt: str, env_type: str, size: Tuple[int, int], rng: Optional[np.random.Generator] = None) -> StructureBuffer:
     """Place structures based on environment type and prompt"""
-    structures = []
+    rng = rng if rng is not None else np.random.default_rng()
+    structures = StructureBuffer()
     width, height = size
     
     if env_type == 'village' or 'village' in prompt:
-        structures.extend(generate_village_structures(size))
+        generate_village_structures(size, structures, rng)
     elif env_type == 'medieval' or 'castle' in prompt:
-        structures.extend(generate_medieval_structures(size))
+        generate_medieval_structures(size, structures)
     elif env_type == 'forest':
-        structures.extend(generate_forest_structures(size))
+        generate_forest_structures(size, structures, rng)
     elif env_type == 'cave' or 'dungeon' in prompt:
-        structures.extend(generate_cave_structures(size))
+        generate_cave_structures(size, structures, rng)
     elif env_type == 'space':
-        structures.extend(generate_space_structures(size))
+        generate_space_structures(size, structures, rng)
     
     # Add specific structures mentioned in prompt
     if 'house' in prompt:
-        structures.append(create_structure('House', random.randint(10, width-10), random.randint(10, height-10)))
+        structures.add('House', int(rng.integers(10, width-10, endpoint=True)), int(rng.integers(10, height-10, endpoint=True)))
     if 'shop' in prompt or 'store' in prompt:
-        structures.append(create_structure('Shop', random.randint(10, width-10), random.randint(10, height-10)))
+        structures.add('Shop', int(rng.integers(10, width-10, endpoint=True)), int(rng.integers(10, height-10, endpoint=True)))
     if 'tower' in prompt:
-        structures.append(create_structure('Tower', random.randint(10, width-10), random.randint(10, height-10)))
+        structures.add('Tower', int(rng.integers(10, width-10, endpoint=True)), int(rng.integers(10, height-10, endpoint=True)))
     if 'bridge' in prompt:
-        structures.append(create_structure('Bridge', width//2, height//2))
+        structures.add('Bridge', width//2, height//2)
     
     return structures
 
-def generate_village_structures(size: Tuple[int, int]) -> List[Dict]:
+def generate_village_structures(size: Tuple[int, int], structures: StructureBuffer, rng: Optional[np.random.Generator] = None) -> None:
     """Generate structures for a village"""
-    structures = []
+    rng = rng if rng is not None else np.random.default_rng()
     width, height = size
     
     # Village center
     center_x, center_y = width // 2, height // 2
     
     # Town hall in center
-    structures.append(create_structure('TownHall', center_x, center_y, size=(8, 8)))
+    structures.add('TownHall', center_x, center_y, size=(8, 8))
     
     # Houses around the center
     house_positions = [
@@ -195,30 +353,27 @@ def generate_village_structures(size: Tuple[int, int]) -> List[Dict]:
         (center_x + 10, center_y + 15),
     ]
     
-    for x, y in house_positions:
-        if 0 < x < width and 0 < y < height:
-            house_type = random.choice(['House', 'Cottage', 'Shop'])
-            structures.append(create_structure(house_type, x, y))
+    house_positions = [(x, y) for x, y in house_positions if 0 < x < width and 0 < y < height]
+    house_types = choose(rng, VILLAGE_HOUSE_TYPES, len(house_positions))
+    for house_type, (x, y) in zip(house_types, house_positions):
+        structures.add(house_type, x, y)
     
     # Well in center
-    structures.append(create_structure('Well', center_x + 5, center_y + 5, size=(2, 2)))
-    
-    return structures
+    structures.add('Well', center_x + 5, center_y + 5, size=(2, 2))
 
-def generate_medieval_structures(size: Tuple[int, int]) -> List[Dict]:
+def generate_medieval_structures(size: Tuple[int, int], structures: StructureBuffer) -> None:
     """Generate structures for medieval environment"""
-    structures = []
     width, height = size
     
     # Castle in center-back
     castle_x, castle_y = width // 2, height // 4
-    structures.append(create_structure('Castle', castle_x, castle_y, size=(20, 15)))
+    structures.add('Castle', castle_x, castle_y, size=(20, 15))
     
     # Walls around castle
     wall_points = generate_castle_walls(castle_x, castle_y, 25, 20)
-    for x, y in wall_points:
-        if 0 < x < width and 0 < y < height:
-            structures.append(create_structure('Wall', x, y, size=(1, 1)))
+    xs, ys = wall_points[:, 0], wall_points[:, 1]
+    inside = (0 < xs) & (xs < width) & (0 < ys) & (ys < height)
+    structures.extend(['Wall'] * int(inside.sum()), xs[inside].tolist(), ys[inside].tolist(), 1, 1)
     
     # Watchtowers at corners
     towers = [
@@ -230,7 +385,7 @@ def generate_medieval_structures(size: Tuple[int, int]) -> List[Dict]:
     
     for x, y in towers:
         if 0 < x < width and 0 < y < height:
-            structures.append(create_structure('Watchtower', x, y, size=(4, 4)))
+            structures.add('Watchtower', x, y, size=(4, 4))
     
     # Village outside walls
     village_center_x, village_center_y = width // 2, height * 3 // 4
@@ -243,47 +398,40 @@ def generate_medieval_structures(size: Tuple[int, int]) -> List[Dict]:
     
     for x, y in village_houses:
         if 0 < x < width and 0 < y < height:
-            structures.append(create_structure('Peasant House', x, y))
-    
-    return structures
+            structures.add('Peasant House', x, y)
 
-def generate_forest_structures(size: Tuple[int, int]) -> List[Dict]:
+def generate_forest_structures(size: Tuple[int, int], structures: StructureBuffer, rng: Optional[np.random.Generator] = None) -> None:
     """Generate structures for forest environment"""
-    structures = []
     width, height = size
     
+    rng = rng if rng is not None else np.random.default_rng()
+    
     # Scattered trees
     tree_count = (width * height) // 50
-    for _ in range(tree_count):
-        x = random.randint(5, width - 5)
-        y = random.randint(5, height - 5)
-        tree_type = random.choice(['Oak', 'Pine', 'Birch', 'Willow'])
-        structures.append(create_structure(f'{tree_type}Tree', x, y, size=(2, 2)))
+    xs = rng.integers(5, width - 5, tree_count, endpoint=True).tolist()
+    ys = rng.integers(5, height - 5, tree_count, endpoint=True).tolist()
+    tree_types = choose(rng, TREE_TYPES, tree_count)
+    structures.extend([f'{tree_type}Tree' for tree_type in tree_types], xs, ys, 2, 2)
     
     # Forest camp
     camp_x, camp_y = width // 3, height // 3
-    structures.append(create_structure('Tent', camp_x, camp_y))
-    structures.append(create_structure('Campfire', camp_x + 3, camp_y + 3, size=(1, 1)))
+    structures.add('Tent', camp_x, camp_y)
+    structures.add('Campfire', camp_x + 3, camp_y + 3, size=(1, 1))
     
     # Hidden cave entrance
-    cave_x, cave_y = random.randint(width//2, width-10), random.randint(height//2, height-10)
-    structures.append(create_structure('CaveEntrance', cave_x, cave_y, size=(3, 2)))
-    
-    return structures
+    cave_x, cave_y = int(rng.integers(width//2, width-10, endpoint=True)), int(rng.integers(height//2, height-10, endpoint=True))
+    structures.add('CaveEntrance', cave_x, cave_y, size=(3, 2))
 
-def generate_cave_structures(size: Tuple[int, int]) -> List[Dict]:
+def generate_cave_structures(size: Tuple[int, int], structures: StructureBuffer, rng: Optional[np.random.Generator] = None) -> None:
     """Generate structures for cave/dungeon environment"""
-    structures = []
+    rng = rng if rng is not None else np.random.default_rng()
     width, height = size
     
     # Cave walls (perimeter)
-    for x in range(width):
-        structures.append(create_structure('CaveWall', x, 0, size=(1, 1)))
-        structures.append(create_structure('CaveWall', x, height-1, size=(1, 1)))
-    
-    for y in range(height):
-        structures.append(create_structure('CaveWall', 0, y, size=(1, 1)))
-        structures.append(create_structure('CaveWall', width-1, y, size=(1, 1)))
+    structures.add_segment('CaveWall', (0, 0), (width-1, 0))
+    structures.add_segment('CaveWall', (0, height-1), (width-1, height-1))
+    structures.add_segment('CaveWall', (0, 0), (0, height-1))
+    structures.add_segment('CaveWall', (width-1, 0), (width-1, height-1))
     
     # Cave chambers
     chambers = [
@@ -294,43 +442,38 @@ def generate_cave_structures(size: Tuple[int, int]) -> List[Dict]:
     
     for chamber_x, chamber_y, chamber_w, chamber_h in chambers:
         # Chamber walls
-        for x in range(chamber_x, chamber_x + chamber_w):
-            structures.append(create_structure('CaveWall', x, chamber_y, size=(1, 1)))
-            structures.append(create_structure('CaveWall', x, chamber_y + chamber_h, size=(1, 1)))
-        
-        for y in range(chamber_y, chamber_y + chamber_h):
-            structures.append(create_structure('CaveWall', chamber_x, y, size=(1, 1)))
-            structures.append(create_structure('CaveWall', chamber_x + chamber_w, y, size=(1, 1)))
+        right_x, bottom_y = chamber_x + chamber_w, chamber_y + chamber_h
+        structures.add_segment('CaveWall', (chamber_x, chamber_y), (right_x-1, chamber_y))
+        structures.add_segment('CaveWall', (chamber_x, bottom_y), (right_x-1, bottom_y))
+        structures.add_segment('CaveWall', (chamber_x, chamber_y), (chamber_x, bottom_y-1))
+        structures.add_segment('CaveWall', (right_x, chamber_y), (right_x, bottom_y-1))
         
         # Chamber entrance
         entrance_x = chamber_x + chamber_w // 2
         entrance_y = chamber_y
-        structures.append(create_structure('Entrance', entrance_x, entrance_y, size=(2, 1)))
+        structures.add('Entrance', entrance_x, entrance_y, size=(2, 1))
         
         # Treasure chest in largest chamber
         if chamber_w >= 10:
             chest_x = chamber_x + chamber_w // 2
             chest_y = chamber_y + chamber_h // 2
-            structures.append(create_structure('TreasureChest', chest_x, chest_y))
+            structures.add('TreasureChest', chest_x, chest_y)
     
     # Stalactites and stalagmites
     feature_count = (width * height) // 100
-    for _ in range(feature_count):
-        x = random.randint(10, width - 10)
-        y = random.randint(10, height - 10)
-        feature_type = random.choice(['Stalactite', 'Stalagmite', 'CrystalFormation'])
-        structures.append(create_structure(feature_type, x, y, size=(1, 1)))
-    
-    return structures
+    xs = rng.integers(10, width - 10, feature_count, endpoint=True).tolist()
+    ys = rng.integers(10, height - 10, feature_count, endpoint=True).tolist()
+    feature_types = choose(rng, CAVE_FEATURE_TYPES, feature_count)
+    structures.extend(feature_types, xs, ys, 1, 1)
 
-def generate_space_structures(size: Tuple[int, int]) -> List[Dict]:
+def generate_space_structures(size: Tuple[int, int], structures: StructureBuffer, rng: Optional[np.random.Generator] = None) -> None:
     """Generate structures for space environment"""
-    structures = []
+    rng = rng if rng is not None else np.random.default_rng()
     width, height = size
     
     # Space station in center
     station_x, station_y = width // 2, height // 2
-    structures.append(create_structure('SpaceStation', station_x, station_y, size=(15, 10)))
+    structures.add('SpaceStation', station_x, station_y, size=(15, 10))
     
     # Landing pads
     pads = [
@@ -342,77 +485,89 @@ def generate_space_structures(size: Tuple[int, int]) -> List[Dict]:
     
     for x, y in pads:
         if 0 < x < width and 0 < y < height:
-            structures.append(create_structure('LandingPad', x, y, size=(6, 6)))
+            structures.add('LandingPad', x, y, size=(6, 6))
     
     # Scattered asteroids
     asteroid_count = (width * height) // 200
-    for _ in range(asteroid_count):
-        x = random.randint(10, width - 10)
-        y = random.randint(10, height - 10)
-        # Don't place asteroids too close to station
-        if abs(x - station_x) > 25 or abs(y - station_y) > 25:
-            asteroid_size = random.choice([(2, 2), (3, 3), (4, 4)])
-            structures.append(create_structure('Asteroid', x, y, size=asteroid_size))
-    
-    return structures
+    xs = rng.integers(10, width - 10, asteroid_count, endpoint=True)
+    ys = rng.integers(10, height - 10, asteroid_count, endpoint=True)
+    # Don't place asteroids too close to station
+    keep = (np.abs(xs - station_x) > 25) | (np.abs(ys - station_y) > 25)
+    xs, ys = xs[keep].tolist(), ys[keep].tolist()
+    asteroid_sizes = rng.integers(2, 4, len(xs), endpoint=True).tolist()
+    structures.extend(['Asteroid'] * len(xs), xs, ys, asteroid_sizes, asteroid_sizes)
 
 def create_structure(structure_type: str, x: int, y: int, size: Tuple[int, int] = (4, 4)) -> Dict:
-    """Create a structure definition"""
+    """Create a flat structure definition (position x/y, footprint w/h)"""
     return {
         "type": structure_type,
-        "position": {"x": x, "y": y},
-        "size": {"width": size[0], "height": size[1]},
+        "x": x,
+        "y": y,
+        "w": size[0],
+        "h": size[1],
         "rotation": 0,
         "properties": get_structure_properties(structure_type)
     }
 
-def get_structure_properties(structure_type: str) -> Dict:
-    """Get default properties for structure types"""
-    properties = {
-        # Buildings
-        'House': {'material': 'Wood', 'color': 'Brown', 'has_door': True, 'interactable': True},
-        'Cottage': {'material': 'Stone', 'color': 'Gray', 'has_door': True, 'interactable': True},
-        'Shop': {'material': 'Wood', 'color': 'Blue', 'has_door': True, 'interactable': True, 'shop_type': 'general'},
-        'TownHall': {'material': 'Stone', 'color': 'White', 'has_door': True, 'interactable': True},
-        'Castle': {'material': 'Stone', 'color': 'Gray', 'has_door': True, 'interactable': True, 'height': 20},
-        'Tower': {'material': 'Stone', 'color': 'Gray', 'height': 15, 'interactable': True},
-        'Watchtower': {'material': 'Stone', 'color': 'Gray', 'height': 12, 'interactable': True},
-        
-        # Natural features
-        'OakTree': {'material': 'Wood', 'color': 'Brown', 'height': 8, 'has_leaves': True},
-        'PineTree': {'material': 'Wood', 'color': 'DarkBrown', 'height': 10, 'has_leaves': True},
-        'BirchTree': {'material': 'Wood', 'color': 'LightBrown', 'height': 7, 'has_leaves': True},
-        'WillowTree': {'material': 'Wood', 'color': 'Brown', 'height': 6, 'has_leaves': True},
-        
-        # Interactive objects
-        'Well': {'material': 'Stone', 'color': 'Gray', 'interactable': True, 'function': 'water_source'},
-        'Campfire': {'material': 'Wood', 'color': 'Orange', 'interactable': True, 'lit': True},
-        'TreasureChest': {'material': 'Wood', 'color': 'Brown', 'interactable': True, 'has_loot': True},
-        
-        # Structural
-        'Wall': {'material': 'Stone', 'color': 'Gray', 'height': 3},
-        'CaveWall': {'material': 'Rock', 'color': 'DarkGray', 'height': 5},
-        'Entrance': {'material': 'Air', 'passable': True},
-        
-        # Cave features
-        'Stalactite': {'material': 'Rock', 'color': 'Gray', 'hangs_from_ceiling': True},
-        'Stalagmite': {'material': 'Rock', 'color': 'Gray', 'rises_from_floor': True},
-        'CrystalFormation': {'material': 'Crystal', 'color': 'Blue', 'glows': True},
-        'CaveEntrance': {'material': 'Rock', 'color': 'DarkGray', 'interactable': True, 'leads_to': 'cave'},
-        
-        # Space structures
-        'SpaceStation': {'material': 'Metal', 'color': 'Silver', 'has_door': True, 'interactable': True},
-        'LandingPad': {'material': 'Metal', 'color': 'Blue', 'landing_point': True},
-        'Asteroid': {'material': 'Rock', 'color': 'Gray', 'minable': True},
-        
-        # Camp
-        'Tent': {'material': 'Fabric', 'color': 'Green', 'has_door': True, 'interactable': True},
-        'PeasantHouse': {'material': 'Wood', 'color': 'Brown', 'has_door': True, 'interactable': True},
+def create_wall_segment(wall_type: str, start: Tuple[int, int], end: Tuple[int, int]) -> Dict:
+    """Create a straight run of 1x1 wall tiles from start to end (inclusive)"""
+    return {
+        "type": "WallSegment",
+        "wall_type": wall_type,
+        "from": {"x": start[0], "y": start[1]},
+        "to": {"x": end[0], "y": end[1]},
+        "properties": get_structure_properties(wall_type)
     }
-    
-    return properties.get(structure_type, {'material': 'Wood', 'color': 'Brown'})
 
-def generate_spawn_points(env_type: str, size: Tuple[int, int], structures: List[Dict]) -> List[Dict]:
+# Default properties per structure type; module-level presets, so callers get copies
+STRUCTURE_PROPERTIES = {
+    # Buildings
+    'House': {'material': 'Wood', 'color': 'Brown', 'has_door': True, 'interactable': True},
+    'Cottage': {'material': 'Stone', 'color': 'Gray', 'has_door': True, 'interactable': True},
+    'Shop': {'material': 'Wood', 'color': 'Blue', 'has_door': True, 'interactable': True, 'shop_type': 'general'},
+    'TownHall': {'material': 'Stone', 'color': 'White', 'has_door': True, 'interactable': True},
+    'Castle': {'material': 'Stone', 'color': 'Gray', 'has_door': True, 'interactable': True, 'height': 20},
+    'Tower': {'material': 'Stone', 'color': 'Gray', 'height': 15, 'interactable': True},
+    'Watchtower': {'material': 'Stone', 'color': 'Gray', 'height': 12, 'interactable': True},
+    
+    # Natural features
+    'OakTree': {'material': 'Wood', 'color': 'Brown', 'height': 8, 'has_leaves': True},
+    'PineTree': {'material': 'Wood', 'color': 'DarkBrown', 'height': 10, 'has_leaves': True},
+    'BirchTree': {'material': 'Wood', 'color': 'LightBrown', 'height': 7, 'has_leaves': True},
+    'WillowTree': {'material': 'Wood', 'color': 'Brown', 'height': 6, 'has_leaves': True},
+    
+    # Interactive objects
+    'Well': {'material': 'Stone', 'color': 'Gray', 'interactable': True, 'function': 'water_source'},
+    'Campfire': {'material': 'Wood', 'color': 'Orange', 'interactable': True, 'lit': True},
+    'TreasureChest': {'material': 'Wood', 'color': 'Brown', 'interactable': True, 'has_loot': True},
+    
+    # Structural
+    'Wall': {'material': 'Stone', 'color': 'Gray', 'height': 3},
+    'CaveWall': {'material': 'Rock', 'color': 'DarkGray', 'height': 5},
+    'Entrance': {'material': 'Air', 'passable': True},
+    
+    # Cave features
+    'Stalactite': {'material': 'Rock', 'color': 'Gray', 'hangs_from_ceiling': True},
+    'Stalagmite': {'material': 'Rock', 'color': 'Gray', 'rises_from_floor': True},
+    'CrystalFormation': {'material': 'Crystal', 'color': 'Blue', 'glows': True},
+    'CaveEntrance': {'material': 'Rock', 'color': 'DarkGray', 'interactable': True, 'leads_to': 'cave'},
+    
+    # Space structures
+    'SpaceStation': {'material': 'Metal', 'color': 'Silver', 'has_door': True, 'interactable': True},
+    'LandingPad': {'material': 'Metal', 'color': 'Blue', 'landing_point': True},
+    'Asteroid': {'material': 'Rock', 'color': 'Gray', 'minable': True},
+    
+    # Camp
+    'Tent': {'material': 'Fabric', 'color': 'Green', 'has_door': True, 'interactable': True},
+    'PeasantHouse': {'material': 'Wood', 'color': 'Brown', 'has_door': True, 'interactable': True},
+}
+DEFAULT_STRUCTURE_PROPERTIES = {'material': 'Wood', 'color': 'Brown'}
+
+def get_structure_properties(structure_type: str) -> Dict:
+    """Get default properties for structure types (a fresh copy the caller may modify)"""
+    return dict(STRUCTURE_PROPERTIES.get(structure_type, DEFAULT_STRUCTURE_PROPERTIES))
+
+def generate_spawn_points(env_type: str, size: Tuple[int, int], structures: StructureBuffer, rng: Optional[np.random.Generator] = None) -> List[Dict]:
     """Generate player and NPC spawn points"""
     spawn_points = []
     width, height = size
@@ -441,212 +596,241 @@ def generate_spawn_points(env_type: str, size: Tuple[int, int], structures: List
         })
     
     # NPC spawn points near structures
-    for structure in structures:
-        if structure["type"] in ["Shop", "TownHall", "House"]:
-            spawn_points.append({
-                "type": "npc",
-                "position": {
-                    "x": structure["position"]["x"] + 2,
-                    "y": structure["position"]["y"] + 2
-                },
-                "npc_type": get_npc_type_for_structure(structure["type"]),
-                "safe": True
-            })
+    for i in np.flatnonzero(structures.mask(NPC_HOST_TYPES)).tolist():
+        structure_type = structures.types[i]
+        spawn_points.append({
+            "type": "npc",
+            "position": {"x": structures.xs[i] + 2, "y": structures.ys[i] + 2},
+            "npc_type": get_npc_type_for_structure(structure_type),
+            "safe": True
+        })
     
     # Enemy spawn points
     if env_type == 'cave':
         # Spawn enemies in cave chambers
-        enemy_count = 5
-        for _ in range(enemy_count):
-            x = random.randint(20, width - 20)
-            y = random.randint(20, height - 20)
-            spawn_points.append({
-                "type": "enemy",
-                "position": {"x": x, "y": y},
-                "enemy_type": random.choice(["Skeleton", "Spider", "Bat"]),
-                "safe": False
-            })
+        enemy_count, margin, enemy_types = 5, 20, CAVE_ENEMY_TYPES
     elif env_type == 'forest':
         # Spawn forest creatures
-        creature_count = 3
-        for _ in range(creature_count):
-            x = random.randint(15, width - 15)
-            y = random.randint(15, height - 15)
-            spawn_points.append({
-                "type": "enemy",
-                "position": {"x": x, "y": y},
-                "enemy_type": random.choice(["Wolf", "Bear", "Bandit"]),
-                "safe": False
-            })
+        enemy_count, margin, enemy_types = 3, 15, FOREST_ENEMY_TYPES
+    else:
+        enemy_count = 0
+    
+    if enemy_count:
+        rng = rng if rng is not None else np.random.default_rng()
+        xs = rng.integers(margin, width - margin, enemy_count, endpoint=True).tolist()
+        ys = rng.integers(margin, height - margin, enemy_count, endpoint=True).tolist()
+        spawn_points.extend({
+            "type": "enemy",
+            "position": {"x": x, "y": y},
+            "enemy_type": enemy_type,
+            "safe": False
+        } for x, y, enemy_type in zip(xs, ys, choose(rng, enemy_types, enemy_count)))
     
     return spawn_points
 
+# Structures that get an NPC spawn next to them
+NPC_HOST_TYPES = frozenset(("Shop", "TownHall", "House"))
+
+# Structures connected to each other by roads
+ROAD_HUB_TYPES = frozenset(("TownHall", "Castle", "Shop", "House", "SpaceStation"))
+
+# NPC type that spawns next to each structure type
+NPC_TYPES = {
+    "Shop": "Shopkeeper",
+    "TownHall": "Mayor",
+    "House": "Villager",
+    "Cottage": "Farmer",
+    "Castle": "Guard",
+    "Tower": "Wizard"
+}
+
 def get_npc_type_for_structure(structure_type: str) -> str:
     """Get appropriate NPC type for structure"""
-    npc_mapping = {
-        "Shop": "Shopkeeper",
-        "TownHall": "Mayor",
-        "House": "Villager",
-        "Cottage": "Farmer",
-        "Castle": "Guard",
-        "Tower": "Wizard"
+    return NPC_TYPES.get(structure_type, "Villager")
+
+# Lighting and atmosphere presets per environment type
+ATMOSPHERE_CONFIGS = {
+    'village': {
+        'sky_color': '#87CEEB',
+        'fog_color': '#F0F8FF',
+        'fog_density': 0.1,
+        'lighting': 'bright',
+        'ambient_sound': 'village_ambience',
+        'time_of_day': 'noon'
+    },
+    'forest': {
+        'sky_color': '#228B22',
+        'fog_color': '#90EE90',
+        'fog_density': 0.3,
+        'lighting': 'filtered',
+        'ambient_sound': 'forest_ambience',
+        'time_of_day': 'morning'
+    },
+    'desert': {
+        'sky_color': '#FFD700',
+        'fog_color': '#F4A460',
+        'fog_density': 0.2,
+        'lighting': 'harsh',
+        'ambient_sound': 'desert_wind',
+        'time_of_day': 'afternoon'
+    },
+    'mountain': {
+        'sky_color': '#4682B4',
+        'fog_color': '#B0C4DE',
+        'fog_density': 0.4,
+        'lighting': 'cool',
+        'ambient_sound': 'mountain_wind',
+        'time_of_day': 'evening'
+    },
+    'beach': {
+        'sky_color': '#00BFFF',
+        'fog_color': '#F0F8FF',
+        'fog_density': 0.1,
+        'lighting': 'warm',
+        'ambient_sound': 'ocean_waves',
+        'time_of_day': 'sunset'
+    },
+    'cave': {
+        'sky_color': '#000000',
+        'fog_color': '#2F2F2F',
+        'fog_density': 0.6,
+        'lighting': 'dark',
+        'ambient_sound': 'cave_echoes',
+        'time_of_day': 'none'
+    },
+    'space': {
+        'sky_color': '#000000',
+        'fog_color': '#191970',
+        'fog_density': 0.0,
+        'lighting': 'artificial',
+        'ambient_sound': 'space_hum',
+        'time_of_day': 'none'
+    },
+    'medieval': {
+        'sky_color': '#708090',
+        'fog_color': '#D3D3D3',
+        'fog_density': 0.2,
+        'lighting': 'medieval',
+        'ambient_sound': 'medieval_ambience',
+        'time_of_day': 'dusk'
     }
-    return npc_mapping.get(structure_type, "Villager")
+}
 
 def generate_atmosphere(env_type: str) -> Dict:
-    """Generate atmosphere settings for the environment"""
-    atmosphere_configs = {
-        'village': {
-            'sky_color': '#87CEEB',
-            'fog_color': '#F0F8FF',
-            'fog_density': 0.1,
-            'lighting': 'bright',
-            'ambient_sound': 'village_ambience',
-            'time_of_day': 'noon'
-        },
-        'forest': {
-            'sky_color': '#228B22',
-            'fog_color': '#90EE90',
-            'fog_density': 0.3,
-            'lighting': 'filtered',
-            'ambient_sound': 'forest_ambience',
-            'time_of_day': 'morning'
-        },
-        'desert': {
-            'sky_color': '#FFD700',
-            'fog_color': '#F4A460',
-            'fog_density': 0.2,
-            'lighting': 'harsh',
-            'ambient_sound': 'desert_wind',
-            'time_of_day': 'afternoon'
-        },
-        'mountain': {
-            'sky_color': '#4682B4',
-            'fog_color': '#B0C4DE',
-            'fog_density': 0.4,
-            'lighting': 'cool',
-            'ambient_sound': 'mountain_wind',
-            'time_of_day': 'evening'
-        },
-        'beach': {
-            'sky_color': '#00BFFF',
-            'fog_color': '#F0F8FF',
-            'fog_density': 0.1,
-            'lighting': 'warm',
-            'ambient_sound': 'ocean_waves',
-            'time_of_day': 'sunset'
-        },
-        'cave': {
-            'sky_color': '#000000',
-            'fog_color': '#2F2F2F',
-            'fog_density': 0.6,
-            'lighting': 'dark',
-            'ambient_sound': 'cave_echoes',
-            'time_of_day': 'none'
-        },
-        'space': {
-            'sky_color': '#000000',
-            'fog_color': '#191970',
-            'fog_density': 0.0,
-            'lighting': 'artificial',
-            'ambient_sound': 'space_hum',
-            'time_of_day': 'none'
-        },
-        'medieval': {
-            'sky_color': '#708090',
-            'fog_color': '#D3D3D3',
-            'fog_density': 0.2,
-            'lighting': 'medieval',
-            'ambient_sound': 'medieval_ambience',
-            'time_of_day': 'dusk'
-        }
-    }
-    
-    return atmosphere_configs.get(env_type, atmosphere_configs['village'])
+    """Generate atmosphere settings for the environment (a fresh copy of the preset)"""
+    return dict(ATMOSPHERE_CONFIGS.get(env_type, ATMOSPHERE_CONFIGS['village']))
 
-def generate_paths(structures: List[Dict], size: Tuple[int, int]) -> List[Dict]:
+def generate_paths(structures: StructureBuffer, size: Tuple[int, int]) -> List[Dict]:
     """Generate paths connecting structures"""
-    paths = []
-    
     # Find important structures to connect
-    important_structures = [s for s in structures if s["type"] in 
-                          ["TownHall", "Castle", "Shop", "House", "SpaceStation"]]
-    
-    # Connect structures with paths
-    for i, start_struct in enumerate(important_structures):
-        for end_struct in important_structures[i+1:]:
-            start_pos = start_struct["position"]
-            end_pos = end_struct["position"]
-            
-            # Generate simple straight path
-            path_points = generate_straight_path(
-                (start_pos["x"], start_pos["y"]),
-                (end_pos["x"], end_pos["y"])
-            )
-            
-            paths.append({
-                "type": "road",
-                "points": path_points,
-                "width": 2,
-                "material": "Stone"
-            })
+    important = structures.mask(ROAD_HUB_TYPES)
+    positions = structures.positions(important)
+    
+    # Connect structures along a minimum spanning tree so every structure is
+    # reachable with len-1 roads instead of a road between every pair
+    edges = np.array(minimum_spanning_edges(positions), dtype=np.intp).reshape(-1, 2)
+    if not len(edges):
+        return []
+    starts = positions[edges[:, 0]].astype(np.float64)
+    deltas = positions[edges[:, 1]] - starts
+    
+    # Rasterize every road in one pass; tests check this yields exactly
+    # generate_straight_path's points for each edge
+    steps = np.abs(deltas).max(axis=1)
+    counts = np.where(steps > 0, steps + 1, 0).astype(np.intp)
+    road = np.repeat(np.arange(len(edges)), counts)
+    offsets = np.cumsum(counts) - counts
+    index = np.arange(counts.sum()) - offsets[road]
+    step_sizes = deltas / np.maximum(steps, 1)[:, None]
+    points = (index[:, None] * step_sizes[road] + starts[road]).astype(np.int32)
+    # Pin the last point of each road to its end position, as np.linspace does
+    ends = offsets + counts - 1
+    points[ends[counts > 0]] = positions[edges[counts > 0, 1]]
+    
+    paths = []
+    for road_points in np.split(points, np.cumsum(counts)[:-1]):
+        paths.append({
+            "type": "road",
+            "points": [{"x": x, "y": y} for x, y in road_points.tolist()],
+            "width": 2,
+            "material": "Stone"
+        })
     
     return paths
 
+def minimum_spanning_edges(positions: np.ndarray) -> List[Tuple[int, int]]:
+    """Return (parent, child) index pairs of a Euclidean minimum spanning tree (Prim's)"""
+    count = len(positions)
+    if count < 2:
+        return []
+    
+    pos = np.asarray(positions, dtype=np.float64)
+    dists = np.hypot(*(pos[:, None, :] - pos[None, :, :]).transpose(2, 0, 1))
+    
+    in_tree = np.zeros(count, dtype=bool)
+    in_tree[0] = True
+    best = dists[0].copy()
+    parent = np.zeros(count, dtype=np.intp)
+    edges = []
+    for _ in range(count - 1):
+        child = int(np.argmin(np.where(in_tree, np.inf, best)))
+        edges.append((int(parent[child]), child))
+        in_tree[child] = True
+        closer = dists[child] < best
+        best[closer] = dists[child][closer]
+        parent[closer] = child
+    
+    return edges
+
 def generate_straight_path(start: Tuple[int, int], end: Tuple[int, int]) -> List[Dict]:
     """Generate a straight path between two points"""
     start_x, start_y = start
     end_x, end_y = end
     
-    points = []
-    
     # Calculate steps
     dx = end_x - start_x
     dy = end_y - start_y
     steps = max(abs(dx), abs(dy))
     
     if steps == 0:
-        return points
-    
-    step_x = dx / steps
-    step_y = dy / steps
+        return []
     
-    for i in range(steps + 1):
-        x = int(start_x + step_x * i)
-        y = int(start_y + step_y * i)
-        points.append({"x": x, "y": y})
+    xs = np.linspace(start_x, end_x, steps + 1).astype(np.int32)
+    ys = np.linspace(start_y, end_y, steps + 1).astype(np.int32)
     
-    return points
+    return [{"x": x, "y": y} for x, y in zip(xs.tolist(), ys.tolist())]
 
-def generate_mountain_features(size: Tuple[int, int]) -> List[Dict]:
+def generate_mountain_features(size: Tuple[int, int], rng: Optional[np.random.Generator] = None) -> List[Dict]:
     """Generate mountain-specific terrain features"""
+    rng = rng if rng is not None else np.random.default_rng()
     features = []
     width, height = size
     
     # Add some peaks
-    peak_count = random.randint(3, 6)
+    peak_count = int(rng.integers(3, 6, endpoint=True))
     for _ in range(peak_count):
-        x = random.randint(width//4, 3*width//4)
-        y = random.randint(height//4, 3*height//4)
+        x = int(rng.integers(width//4, 3*width//4, endpoint=True))
+        y = int(rng.integers(height//4, 3*height//4, endpoint=True))
         features.append({
             "type": "peak",
             "position": {"x": x, "y": y},
-            "height": random.randint(20, 40)
+            "height": int(rng.integers(20, 40, endpoint=True))
         })
     
     return features
 
-def generate_forest_features(size: Tuple[int, int]) -> List[Dict]:
+def generate_forest_features(size: Tuple[int, int], rng: Optional[np.random.Generator] = None) -> List[Dict]:
     """Generate forest-specific terrain features"""
+    rng = rng if rng is not None else np.random.default_rng()
     features = []
     width, height = size
     
     # Add clearings
-    clearing_count = random.randint(2, 4)
+    clearing_count = int(rng.integers(2, 4, endpoint=True))
     for _ in range(clearing_count):
-        x = random.randint(10, width-10)
-        y = random.randint(10, height-10)
-        radius = random.randint(5, 10)
+        x = int(rng.integers(10, width-10, endpoint=True))
+        y = int(rng.integers(10, height-10, endpoint=True))
+        radius = int(rng.integers(5, 10, endpoint=True))
         features.append({
             "type": "clearing",
             "position": {"x": x, "y": y},
@@ -655,75 +839,85 @@ def generate_forest_features(size: Tuple[int, int]) -> List[Dict]:
     
     return features
 
-def generate_desert_features(size: Tuple[int, int]) -> List[Dict]:
+def generate_desert_features(size: Tuple[int, int], rng: Optional[np.random.Generator] = None) -> List[Dict]:
     """Generate desert-specific terrain features"""
+    rng = rng if rng is not None else np.random.default_rng()
     features = []
     width, height = size
     
     # Add oases
-    oasis_count = random.randint(1, 3)
+    oasis_count = int(rng.integers(1, 3, endpoint=True))
     for _ in range(oasis_count):
-        x = random.randint(20, width-20)
-        y = random.randint(20, height-20)
+        x = int(rng.integers(20, width-20, endpoint=True))
+        y = int(rng.integers(20, height-20, endpoint=True))
         features.append({
             "type": "oasis",
             "position": {"x": x, "y": y},
-            "radius": random.randint(3, 8)
+            "radius": int(rng.integers(3, 8, endpoint=True))
         })
     
     return features
 
-def generate_beach_features(size: Tuple[int, int]) -> List[Dict]:
+def generate_beach_features(size: Tuple[int, int], rng: Optional[np.random.Generator] = None) -> List[Dict]:
     """Generate beach-specific terrain features"""
+    rng = rng if rng is not None else np.random.default_rng()
     features = []
     width, height = size
     
     # Add rock formations along shore
-    rock_count = random.randint(3, 8)
+    rock_count = int(rng.integers(3, 8, endpoint=True))
     for _ in range(rock_count):
-        x = random.randint(int(width*0.2), int(width*0.6))
-        y = random.randint(10, height-10)
+        x = int(rng.integers(int(width*0.2), int(width*0.6), endpoint=True))
+        y = int(rng.integers(10, height-10, endpoint=True))
         features.append({
             "type": "rock_formation",
             "position": {"x": x, "y": y},
-            "size": random.randint(2, 5)
+            "size": int(rng.integers(2, 5, endpoint=True))
         })
     
     return features
 
-def generate_castle_walls(center_x: int, center_y: int, wall_width: int, wall_height: int) -> List[Tuple[int, int]]:
-    """Generate points for castle walls"""
-    points = []
-    
-    # Top wall
-    for x in range(center_x - wall_width//2, center_x + wall_width//2):
-        points.append((x, center_y - wall_height//2))
-    
-    # Bottom wall
-    for x in range(center_x - wall_width//2, center_x + wall_width//2):
-        points.append((x, center_y + wall_height//2))
-    
-    # Left wall
-    for y in range(center_y - wall_height//2, center_y + wall_height//2):
-        points.append((center_x - wall_width//2, y))
-    
-    # Right wall
-    for y in range(center_y - wall_height//2, center_y + wall_height//2):
-        points.append((center_x + wall_width//2, y))
-    
-    return points
+TERRAIN_GENERATORS = {
+    'mountain': _mountain_terrain,
+    'desert': _desert_terrain,
+    'beach': _beach_terrain,
+    'cave': _cave_terrain,
+    'forest': _forest_terrain,
+}
+
+TERRAIN_FEATURE_GENERATORS = {
+    'mountain': generate_mountain_features,
+    'forest': generate_forest_features,
+    'desert': generate_desert_features,
+    'beach': generate_beach_features,
+}
+
+def generate_castle_walls(center_x: int, center_y: int, wall_width: int, wall_height: int) -> np.ndarray:
+    """Generate points for castle walls as an (N, 2) array of x, y"""
+    left, right = center_x - wall_width//2, center_x + wall_width//2
+    top, bottom = center_y - wall_height//2, center_y + wall_height//2
+    xs = np.arange(left, right)
+    ys = np.arange(top, bottom)
+    
+    return np.vstack([
+        np.column_stack((xs, np.full_like(xs, top))),  # Top wall
+        np.column_stack((xs, np.full_like(xs, bottom))),  # Bottom wall
+        np.column_stack((np.full_like(ys, left), ys)),  # Left wall
+        np.column_stack((np.full_like(ys, right), ys)),  # Right wall
+    ])
 
 def generate_fallback_environment(size: Tuple[int, int]) -> Dict:
     """Generate a basic fallback environment when other methods fail"""
     width, height = size
+    rng = np.random.default_rng()
     
     return {
         "type": "plains",
         "size": size,
         "terrain": {
             "type": "plains",
-            "heightmap": [[random.uniform(0, 2) for _ in range(width)] for _ in range(height)],
-            "materials": [["Grass" for _ in range(width)] for _ in range(height)],
+            "heightmap": encode_heightmap(rng.uniform(0, 2, (height, width))),
+            "materials": encode_materials(np.full((height, width), MATERIAL_GRASS, dtype=np.uint8)),
             "features": []
         },
         "structures": [
@@ -740,6 +934,6 @@ def generate_fallback_environment(size: Tuple[int, int]) -> Dict:
         "paths": [],
         "metadata": {
             "prompt": "fallback environment",
-            "version": "1.0"
+            "version": "1.2"
         }
     }
\ No newline at end of file
@@ -2,10 +2,22 @@ import os
 import logging
 import numpy as np
 import trimesh
-import json
+from trimesh.exchange.gltf import export_glb
+from trimesh.exchange.ply import export_ply
+from trimesh.exchange.stl import export_stl
+import orjson
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass
 from enum import Enum
+from PIL import Image
+
+# meshoptimizer's C simplifier is the fallback when quadric decimation is unavailable
+try:
+    import meshoptimizer
+    MESHOPTIMIZER_AVAILABLE = True
+except ImportError:
+    MESHOPTIMIZER_AVAILABLE = False
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -20,7 +32,7 @@ class ExportFormat(Enum):
     PLY = "ply"
     RBXM = "rbxm"  # Roblox model format
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class OptimizationConfig:
     """Configuration for export optimization"""
     target_poly_count: int = 5000
@@ -30,11 +42,45 @@ class OptimizationConfig:
     compress_textures: bool = True
     optimize_for_game_engine: str = "roblox"  # "roblox", "unity", "unreal", "general"
 
+def _compact(vertices: np.ndarray, faces: np.ndarray) -> trimesh.Trimesh:
+    """Build a mesh from faces indexing into a larger vertex buffer, keeping only the vertices they use"""
+    used, remapped = np.unique(faces, return_inverse=True)
+    return trimesh.Trimesh(vertices=vertices[used], faces=remapped.reshape(-1, 3), process=False)
+
+def _meshopt_simplify(vertices: np.ndarray, faces: np.ndarray, target_face_count: int) -> np.ndarray:
+    """Simplify with meshoptimizer, returning faces that index into the original vertex buffer"""
+    indices = np.ascontiguousarray(faces, dtype=np.uint32).ravel()
+    destination = np.empty_like(indices)
+    index_count = meshoptimizer.simplify(
+        destination, indices, np.ascontiguousarray(vertices, dtype=np.float32),
+        target_index_count=target_face_count * 3,
+        target_error=1e-2
+    )
+    return destination[:index_count].reshape(-1, 3)
+
+@dataclass
+class LODChain:
+    """LOD levels stored as index buffers into one shared vertex buffer; level 0 is full detail"""
+    vertices: np.ndarray
+    levels: List[np.ndarray]
+    
+    def mesh(self, level: int) -> trimesh.Trimesh:
+        """Standalone mesh for one LOD level"""
+        return _compact(self.vertices, self.levels[level])
+
 class ExportEngine:
     """Export engine with optimization for game-ready assets"""
     
     def __init__(self, optimization_config: OptimizationConfig = None):
         self.config = optimization_config or OptimizationConfig()
+        self._exporters = {
+            ExportFormat.OBJ: self._export_obj,
+            ExportFormat.FBX: self._export_fbx,
+            ExportFormat.GLTF: self._export_gltf,
+            ExportFormat.STL: self._export_stl,
+            ExportFormat.PLY: self._export_ply,
+            ExportFormat.RBXM: self._export_rbxm,
+        }
     
     def export_model(self, mesh: trimesh.Trimesh, format: ExportFormat, output_path: str, 
                      textures: Optional[Dict[str, Any]] = None) -> bool:
@@ -51,29 +97,31 @@ class ExportEngine:
             True if export was successful, False otherwise
         """
         try:
+            exporter = self._exporters.get(format)
+            if exporter is None:
+                raise ValueError(f"Unsupported export format: {format}")
+            
             # Optimize mesh for game-ready export
             optimized_mesh = self._optimize_mesh(mesh)
-            
-            # Export based on format
-            if format == ExportFormat.OBJ:
-                return self._export_obj(optimized_mesh, output_path, textures)
-            elif format == ExportFormat.FBX:
-                return self._export_fbx(optimized_mesh, output_path, textures)
-            elif format == ExportFormat.GLTF:
-                return self._export_gltf(optimized_mesh, output_path, textures)
-            elif format == ExportFormat.STL:
-                return self._export_stl(optimized_mesh, output_path)
-            elif format == ExportFormat.PLY:
-                return self._export_ply(optimized_mesh, output_path)
-            elif format == ExportFormat.RBXM:
-                return self._export_rbxm(optimized_mesh, output_path, textures)
-            else:
-                raise ValueError(f"Unsupported export format: {format}")
+            return exporter(optimized_mesh, output_path, textures)
                 
         except Exception as e:
             logger.error(f"Error exporting model: {e}")
             return False
     
+    def generate_lods(self, mesh: trimesh.Trimesh) -> LODChain:
+        """
+        Generate LODs for a mesh
+        
+        Level 0 is the optimized mesh export_model writes; each further level
+        halves its face count. Only callers that use LODs pay for them, and the
+        chain is returned rather than kept on the (shared) engine.
+        """
+        optimized_mesh = self._optimize_mesh(mesh)
+        if not self.config.generate_lods:
+            return LODChain(vertices=optimized_mesh.vertices.view(np.ndarray), levels=[optimized_mesh.faces.view(np.ndarray)])
+        return self._generate_lods(optimized_mesh)
+    
     def _optimize_mesh(self, mesh: trimesh.Trimesh) -> trimesh.Trimesh:
         """Optimize mesh for game-ready export"""
         logger.info("Optimizing mesh for game-ready export...")
@@ -84,10 +132,6 @@ class ExportEngine:
         else:
             simplified_mesh = mesh.copy()
         
-        # Generate LODs if requested
-        if self.config.generate_lods:
-            self._generate_lods(simplified_mesh)
-        
         # Optimize for specific game engine
         if self.config.optimize_for_game_engine == "roblox":
             simplified_mesh = self._optimize_for_roblox(simplified_mesh)
@@ -103,18 +147,46 @@ class ExportEngine:
             return simplified
         except Exception as e:
             logger.warning(f"Failed to simplify mesh with quadric decimation: {e}")
-            # Fallback to simple decimation
-            ratio = target_face_count / len(mesh.faces)
-            simplified = mesh.simplify(ratio)
-            logger.info(f"Simplified mesh from {len(mesh.faces)} to {len(simplified.faces)} faces (fallback)")
+            if not MESHOPTIMIZER_AVAILABLE:
+                logger.warning("meshoptimizer not installed, exporting mesh without simplification")
+                return mesh
+            
+            # Fallback to meshoptimizer's simplifier, keeping only the vertices
+            # the simplified faces still use
+            vertices = mesh.vertices.view(np.ndarray)
+            simplified = _compact(vertices, _meshopt_simplify(vertices, mesh.faces, target_face_count))
+            logger.info(f"Simplified mesh from {len(mesh.faces)} to {len(simplified.faces)} faces (meshoptimizer)")
             return simplified
     
-    def _generate_lods(self, mesh: trimesh.Trimesh):
-        """Generate LODs for the mesh"""
+    def _generate_lods(self, mesh: trimesh.Trimesh) -> LODChain:
+        """Generate LODs for the mesh, halving the face count at each level"""
         logger.info(f"Generating {self.config.lod_levels} LOD levels...")
-        # In a real implementation, this would generate multiple LOD versions
-        # For now, we'll just log that LODs would be generated
+        vertices = mesh.vertices.view(np.ndarray)
+        faces = mesh.faces.view(np.ndarray)
+        face_count = len(faces)
+        targets = [max(64, int(face_count * 0.5 ** level)) for level in range(1, self.config.lod_levels + 1)]
+        targets = [target for target in targets if target < face_count]
+        if not targets:
+            return LODChain(vertices=vertices, levels=[faces])
         
+        # Each level is simplified independently from the base mesh; the
+        # decimation runs in native code, so the levels overlap across threads
+        with ThreadPoolExecutor(max_workers=len(targets)) as executor:
+            if MESHOPTIMIZER_AVAILABLE:
+                # meshoptimizer only rewrites the index buffer, so every level
+                # shares the base vertices instead of carrying its own copy
+                levels = list(executor.map(lambda target: _meshopt_simplify(vertices, faces, target), targets))
+                return LODChain(vertices=vertices, levels=[faces] + levels)
+            
+            meshes = list(executor.map(lambda target: self._simplify_mesh(mesh, target), targets))
+        
+        # Quadric decimation emits new vertices; pack them after the base ones
+        offsets = np.cumsum([len(vertices)] + [len(lod.vertices) for lod in meshes])
+        return LODChain(
+            vertices=np.vstack([vertices] + [lod.vertices.view(np.ndarray) for lod in meshes]),
+            levels=[faces] + [lod.faces.view(np.ndarray) + offset for lod, offset in zip(meshes, offsets)]
+        )
+    
     def _optimize_for_roblox(self, mesh: trimesh.Trimesh) -> trimesh.Trimesh:
         """Optimize mesh for Roblox"""
         logger.info("Optimizing mesh for Roblox...")
@@ -123,28 +195,50 @@ class ExportEngine:
         # - Proper UV coordinates
         # - Efficient vertex count
         
-        # Ensure mesh is triangulated
+        # Trimesh faces are always triangles; a closed triangle mesh has
+        # every edge shared by exactly two faces, so 2E == 3F
+        if mesh.faces.shape[1] == 3 and 2 * len(mesh.edges_unique) == 3 * len(mesh.faces):
+            return mesh
+        
         if not mesh.is_watertight:
             logger.info("Mesh is not watertight, attempting to fix...")
-            # Try to make it watertight
+            # Only repair the components that are actually open
             try:
-                mesh = mesh.fill_holes()
+                components = mesh.split(only_watertight=False)
+                for component in components:
+                    if not component.is_watertight:
+                        trimesh.repair.fill_holes(component)
+                        trimesh.repair.fix_inversion(component)
+                mesh = trimesh.util.concatenate(components)
             except Exception as e:
                 logger.warning(f"Failed to fill holes: {e}")
         
-        # Ensure mesh is triangulated
-        if not mesh.is_tri:
-            logger.info("Triangulating mesh...")
-            mesh = mesh.triangulate()
-        
         return mesh
     
     def _export_obj(self, mesh: trimesh.Trimesh, output_path: str, textures: Optional[Dict[str, Any]] = None) -> bool:
         """Export mesh as OBJ"""
         logger.info(f"Exporting mesh as OBJ to {output_path}")
         try:
-            # Export mesh
-            mesh.export(output_path, file_type='obj')
+            # Export mesh; plain and vertex-colored meshes are formatted one
+            # whole section at a time (a single % call each) instead of
+            # trimesh's line builder. Anything else (textures/UVs, face
+            # colors) goes through trimesh so nothing is dropped.
+            if mesh.visual.kind in (None, 'vertex'):
+                vertices = mesh.vertices.view(np.ndarray)
+                faces = mesh.faces.view(np.ndarray) + 1
+                if mesh.visual.kind == 'vertex':
+                    # Same "v x y z r g b" layout trimesh writes, colors in 0-1
+                    colors = np.asarray(mesh.visual.vertex_colors)[:, :3] / 255.0
+                    vertex_lines = 'v %.6f %.6f %.6f %.8f %.8f %.8f\n'
+                    vertices = np.hstack((vertices, colors))
+                else:
+                    vertex_lines = 'v %.6f %.6f %.6f\n'
+                with open(output_path, 'w') as f:
+                    f.write('# ModelForge OBJ export\n')
+                    f.write((vertex_lines * len(vertices)) % tuple(vertices.ravel().tolist()))
+                    f.write(('f %d %d %d\n' * len(faces)) % tuple(faces.ravel().tolist()))
+            else:
+                mesh.export(output_path, file_type='obj')
             
             # Export textures if provided
             if textures:
@@ -172,11 +266,20 @@ class ExportEngine:
             return False
     
     def _export_gltf(self, mesh: trimesh.Trimesh, output_path: str, textures: Optional[Dict[str, Any]] = None) -> bool:
-        """Export mesh as GLTF"""
+        """Export mesh as binary glTF (GLB)"""
         logger.info(f"Exporting mesh as GLTF to {output_path}")
+        # GLB keeps the vertex/index buffers as raw bytes in the same file
+        # instead of separate .bin files next to a JSON document, so the path
+        # must say so; writing elsewhere would leave callers looking for a
+        # file that doesn't exist
+        if os.path.splitext(output_path)[1].lower() != '.glb':
+            logger.error(f"GLTF exports are written as binary glTF; use a .glb output path, not {output_path}")
+            return False
         try:
             # Export mesh
-            mesh.export(output_path, file_type='gltf')
+            data = export_glb(mesh)
+            with open(output_path, 'wb') as f:
+                f.write(data)
             
             # Export textures if provided
             if textures:
@@ -187,23 +290,27 @@ class ExportEngine:
             logger.error(f"Error exporting GLTF: {e}")
             return False
     
-    def _export_stl(self, mesh: trimesh.Trimesh, output_path: str) -> bool:
+    def _export_stl(self, mesh: trimesh.Trimesh, output_path: str, textures: Optional[Dict[str, Any]] = None) -> bool:
         """Export mesh as STL"""
         logger.info(f"Exporting mesh as STL to {output_path}")
         try:
-            # Export mesh (STL doesn't support textures)
-            mesh.export(output_path, file_type='stl')
+            # Export mesh (STL doesn't support textures) as binary in a single write
+            data = export_stl(mesh)
+            with open(output_path, 'wb') as f:
+                f.write(data)
             return True
         except Exception as e:
             logger.error(f"Error exporting STL: {e}")
             return False
     
-    def _export_ply(self, mesh: trimesh.Trimesh, output_path: str) -> bool:
+    def _export_ply(self, mesh: trimesh.Trimesh, output_path: str, textures: Optional[Dict[str, Any]] = None) -> bool:
         """Export mesh as PLY"""
         logger.info(f"Exporting mesh as PLY to {output_path}")
         try:
-            # Export mesh (PLY doesn't support textures by default)
-            mesh.export(output_path, file_type='ply')
+            # Export mesh (PLY doesn't support textures by default) as binary in a single write
+            data = export_ply(mesh, encoding='binary')
+            with open(output_path, 'wb') as f:
+                f.write(data)
             return True
         except Exception as e:
             logger.error(f"Error exporting PLY: {e}")
@@ -230,8 +337,8 @@ class ExportEngine:
             }
             
             # Save as JSON for now
-            with open(output_path, 'w') as f:
-                json.dump(rbxm_data, f, indent=2)
+            with open(output_path, 'wb') as f:
+                f.write(orjson.dumps(rbxm_data, option=orjson.OPT_INDENT_2))
             
             # Export textures if provided
             if textures:
@@ -243,10 +350,18 @@ class ExportEngine:
             return False
     
     def _export_textures(self, textures: Dict[str, Any], output_path: str):
-        """Export textures to files"""
+        """Export textures to PNG files next to the model, named <model>_<texture>.png"""
         logger.info("Exporting textures...")
-        # In a real implementation, this would save texture data to files
-        # For now, we'll just log that textures would be exported
+        base = os.path.splitext(output_path)[0]
+        
+        def write_texture(name: str, texture: Any):
+            image = texture if isinstance(texture, Image.Image) else Image.fromarray(np.asarray(texture))
+            # Fast zlib level: game textures favour export speed over a few percent of size
+            image.save(f"{base}_{name}.png", optimize=False, compress_level=1)
+        
+        # PNG encoding releases the GIL inside zlib, so textures encode in parallel
+        with ThreadPoolExecutor(max_workers=min(8, len(textures))) as executor:
+            list(executor.map(write_texture, textures.keys(), textures.values()))
 
 # Convenience function for easy access
 def create_export_engine(optimization_config: OptimizationConfig = None) -> ExportEngine:
@@ -1,6 +1,7 @@
 import os
+import re
+import functools
 import logging
-import torch
 import numpy as np
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass
@@ -11,13 +12,133 @@ from PIL import Image
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _frozen(data, dtype) -> np.ndarray:
+    """Build a read-only array so shared primitive buffers can't be mutated by callers"""
+    array = np.array(data, dtype=dtype)
+    array.flags.writeable = False
+    return array
+
+# Prompt keywords for each procedural primitive, in priority order
+_SHAPE_PRIORITY = ('sphere', 'cube', 'cylinder', 'cone')
+_SHAPE_KEYWORDS = {
+    'sphere': 'sphere', 'ball': 'sphere', 'orb': 'sphere',
+    'cube': 'cube', 'box': 'cube', 'block': 'cube',
+    'cylinder': 'cylinder', 'tube': 'cylinder', 'pipe': 'cylinder',
+    'cone': 'cone', 'pyramid': 'cone',
+}
+_SHAPE_KEYWORD_PATTERN = re.compile('|'.join(sorted(_SHAPE_KEYWORDS, key=len, reverse=True)))
+
+@functools.lru_cache(maxsize=64)
+def _prompt_shape(prompt: str) -> str:
+    """Primitive shape for a prompt"""
+    # Keyed on the raw prompt so repeats skip the lower() copy; case variants
+    # of a prompt still share one classification below
+    return _classify_shape(prompt.lower())
+
+@functools.lru_cache(maxsize=64)
+def _classify_shape(prompt_lower: str) -> str:
+    """Primitive shape for a lowercased prompt: one scan for every keyword, earliest shape wins"""
+    found = {_SHAPE_KEYWORDS[match] for match in _SHAPE_KEYWORD_PATTERN.findall(prompt_lower)}
+    for shape in _SHAPE_PRIORITY:
+        if shape in found:
+            return shape
+    
+    # Default to a simple cube
+    return 'cube'
+
+# Primitive meshes are built once (per resolution for round shapes) and shared
+# read-only by every call
+
+def _ring(count: int, radius: float, z: float) -> np.ndarray:
+    """count points evenly spaced on a circle of the given radius at height z"""
+    angles = np.arange(count) * (2 * np.pi / count)
+    return np.column_stack((radius * np.cos(angles), radius * np.sin(angles), np.full(count, z)))
+
+def _band_faces(first: int, rings: int, segments: int) -> np.ndarray:
+    """Two triangles per quad joining consecutive rings of `segments` vertices, starting at index `first`"""
+    ring = np.arange(rings - 1)[:, None] * segments + first
+    col = np.arange(segments)[None, :]
+    a = ring + col
+    b = ring + (col + 1) % segments
+    # Fill one preallocated index buffer instead of stacking temporaries
+    faces = np.empty((rings - 1, segments, 2, 3), dtype=np.uint32)
+    faces[..., 0, 0] = faces[..., 1, 0] = a
+    faces[..., 0, 1] = b
+    faces[..., 0, 2] = faces[..., 1, 1] = b + segments
+    faces[..., 1, 2] = a + segments
+    return faces.reshape(-1, 3)
+
+def _fan_faces(center: int, first: int, segments: int, flip: bool = False) -> np.ndarray:
+    """Triangle fan from `center` to a ring of `segments` vertices starting at index `first`"""
+    col = np.arange(segments)
+    faces = np.column_stack((np.full(segments, center), first + col, first + (col + 1) % segments))
+    return faces[:, ::-1] if flip else faces
+
+@functools.lru_cache(maxsize=8)
+def _sphere_mesh(segments: int) -> Tuple[np.ndarray, np.ndarray]:
+    """UV sphere of radius 1: `segments` around, segments // 2 rings pole to pole"""
+    rings = max(segments // 2, 2)
+    polar = np.arange(1, rings) * (np.pi / rings)
+    vertices = np.vstack([
+        [[0, 0, 1]],
+        *[_ring(segments, np.sin(theta), np.cos(theta)) for theta in polar],
+        [[0, 0, -1]],
+    ])
+    bottom = len(vertices) - 1
+    faces = np.vstack((
+        _fan_faces(0, 1, segments),
+        _band_faces(1, rings - 1, segments)[:, ::-1],  # Rings run top to bottom
+        _fan_faces(bottom, bottom - segments, segments, flip=True),
+    ))
+    return _frozen(vertices, np.float32), _frozen(faces, np.uint32)
+
+@functools.lru_cache(maxsize=8)
+def _cylinder_mesh(segments: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Capped cylinder of radius 1 from z=-1 to z=1"""
+    vertices = np.vstack(([[0, 0, -1], [0, 0, 1]], _ring(segments, 1, -1), _ring(segments, 1, 1)))
+    faces = np.vstack((
+        _fan_faces(0, 2, segments, flip=True),  # Bottom cap
+        _fan_faces(1, 2 + segments, segments),  # Top cap
+        _band_faces(2, 2, segments),  # Sides
+    ))
+    return _frozen(vertices, np.float32), _frozen(faces, np.uint32)
+
+@functools.lru_cache(maxsize=8)
+def _cone_mesh(segments: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Cone of base radius 1 at z=-1 with its apex at z=1"""
+    vertices = np.vstack(([[0, 0, -1], [0, 0, 1]], _ring(segments, 1, -1)))
+    faces = np.vstack((
+        _fan_faces(0, 2, segments, flip=True),  # Base
+        _fan_faces(1, 2, segments),  # Sides
+    ))
+    return _frozen(vertices, np.float32), _frozen(faces, np.uint32)
+
+_CUBE_VERTICES = _frozen([
+    [-1, -1, -1], [1, -1, -1], [1, 1, -1], [-1, 1, -1],
+    [-1, -1, 1], [1, -1, 1], [1, 1, 1], [-1, 1, 1]
+], np.float32)
+
+_CUBE_FACES = _frozen([
+    [0, 1, 2], [0, 2, 3], [4, 7, 6], [4, 6, 5],
+    [0, 4, 5], [0, 5, 1], [2, 6, 7], [2, 7, 3],
+    [0, 3, 7], [0, 7, 4], [1, 5, 6], [1, 6, 2]
+], np.uint32)
+
+_PLACEHOLDER_VERTICES = _frozen([
+    [0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1]
+], np.float32)
+
+_PLACEHOLDER_FACES = _frozen([
+    [0, 1, 2], [0, 1, 3], [1, 2, 3], [0, 2, 3]
+], np.uint32)
+
 class GeometryEngine(Enum):
     """Available geometry generation engines"""
     NERF = "nerf"
     GAUSSIAN_SPLATTING = "gaussian_splatting"
     PROCEDURAL = "procedural"
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class GeometryConfig:
     """Configuration for geometry generation"""
     engine: GeometryEngine = GeometryEngine.PROCEDURAL
@@ -31,10 +152,20 @@ class GeometryGenerator:
     
     def __init__(self, config: GeometryConfig = None):
         self.config = config or GeometryConfig()
-        self.device = torch.device(self.config.device if torch.cuda.is_available() else "cpu")
+        self._device = None
         self.model = None
         self._initialize_model()
     
+    @property
+    def device(self):
+        """Torch device, resolved on first use so procedural generation never initializes CUDA"""
+        if self._device is None:
+            # torch is only needed by the learned engines; keep it off the import path
+            import torch
+            self._device = torch.device(self.config.device if torch.cuda.is_available() else "cpu")
+            logger.info(f"Geometry generator using device {self._device}")
+        return self._device
+    
     def _initialize_model(self):
         """Initialize the geometry generation model"""
         try:
@@ -48,7 +179,7 @@ class GeometryGenerator:
             else:
                 raise ValueError(f"Unsupported engine: {self.config.engine}")
                 
-            logger.info(f"Initialized {self.config.engine.value} geometry generator on {self.device}")
+            logger.info(f"Initialized {self.config.engine.value} geometry generator")
         except Exception as e:
             logger.error(f"Failed to initialize geometry generator: {e}")
             raise
@@ -174,97 +305,34 @@ class GeometryGenerator:
     
     def _create_mesh_from_prompt(self, prompt: str) -> Tuple[np.ndarray, np.ndarray]:
         """Create a simple mesh based on the prompt"""
-        prompt_lower = prompt.lower()
-        
-        # Simple shape detection
-        if any(word in prompt_lower for word in ['sphere', 'ball', 'orb']):
-            return self._create_sphere()
-        elif any(word in prompt_lower for word in ['cube', 'box', 'block']):
-            return self._create_cube()
-        elif any(word in prompt_lower for word in ['cylinder', 'tube', 'pipe']):
-            return self._create_cylinder()
-        elif any(word in prompt_lower for word in ['cone', 'pyramid']):
-            return self._create_cone()
-        else:
-            # Default to a simple cube
-            return self._create_cube()
+        # Shape detection is memoized per prompt and the primitives themselves
+        # are cached read-only, so repeated prompts skip all the work
+        return getattr(self, f'_create_{_prompt_shape(prompt)}')()
+    
+    def _segments(self) -> int:
+        """Radial segment count for round primitives, scaled from config.resolution"""
+        # Keep round primitives game-friendly: 256 resolution -> 64 segments
+        return int(np.clip(self.config.resolution // 4, 8, 64))
     
     def _create_sphere(self) -> Tuple[np.ndarray, np.ndarray]:
-        """Create a simple sphere mesh"""
-        # This is a very simplified sphere
-        vertices = np.array([
-            [0, 0, 1], [0, 1, 0], [1, 0, 0],
-            [0, 0, -1], [0, -1, 0], [-1, 0, 0],
-            [0, 1, 0], [1, 0, 0], [0, 0, 1]
-        ], dtype=np.float32)
-        
-        faces = np.array([
-            [0, 1, 2], [3, 4, 5], [0, 2, 6],
-            [3, 5, 7], [1, 4, 6], [2, 5, 7]
-        ], dtype=np.int32)
-        
-        return vertices, faces
+        """Create a sphere mesh"""
+        return _sphere_mesh(self._segments())
     
     def _create_cube(self) -> Tuple[np.ndarray, np.ndarray]:
         """Create a simple cube mesh"""
-        vertices = np.array([
-            [-1, -1, -1], [1, -1, -1], [1, 1, -1], [-1, 1, -1],
-            [-1, -1, 1], [1, -1, 1], [1, 1, 1], [-1, 1, 1]
-        ], dtype=np.float32)
-        
-        faces = np.array([
-            [0, 1, 2], [0, 2, 3], [4, 7, 6], [4, 6, 5],
-            [0, 4, 5], [0, 5, 1], [2, 6, 7], [2, 7, 3],
-            [0, 3, 7], [0, 7, 4], [1, 5, 6], [1, 6, 2]
-        ], dtype=np.int32)
-        
-        return vertices, faces
+        return _CUBE_VERTICES, _CUBE_FACES
     
     def _create_cylinder(self) -> Tuple[np.ndarray, np.ndarray]:
-        """Create a simple cylinder mesh"""
-        vertices = np.array([
-            [0, 0, -1], [0, 0, 1],  # Center points
-            [1, 0, -1], [1, 0, 1],  # Points on the circle
-            [0, 1, -1], [0, 1, 1],
-            [-1, 0, -1], [-1, 0, 1],
-            [0, -1, -1], [0, -1, 1]
-        ], dtype=np.float32)
-        
-        faces = np.array([
-            [0, 2, 4], [0, 4, 6], [0, 6, 8], [0, 8, 2],  # Bottom cap
-            [1, 3, 5], [1, 5, 7], [1, 7, 9], [1, 9, 3],  # Top cap
-            [2, 3, 5], [2, 5, 4], [4, 5, 7], [4, 7, 6],  # Sides
-            [6, 7, 9], [6, 9, 8], [8, 9, 3], [8, 3, 2]
-        ], dtype=np.int32)
-        
-        return vertices, faces
+        """Create a cylinder mesh"""
+        return _cylinder_mesh(self._segments())
     
     def _create_cone(self) -> Tuple[np.ndarray, np.ndarray]:
-        """Create a simple cone mesh"""
-        vertices = np.array([
-            [0, 0, -1],  # Base center
-            [0, 0, 1],   # Apex
-            [1, 0, -1], [0, 1, -1], [-1, 0, -1], [0, -1, -1]  # Base points
-        ], dtype=np.float32)
-        
-        faces = np.array([
-            [0, 2, 3], [0, 3, 4], [0, 4, 5], [0, 5, 2],  # Base
-            [1, 2, 3], [1, 3, 4], [1, 4, 5], [1, 5, 2]   # Sides
-        ], dtype=np.int32)
-        
-        return vertices, faces
+        """Create a cone mesh"""
+        return _cone_mesh(self._segments())
     
     def _create_placeholder_mesh(self) -> Tuple[np.ndarray, np.ndarray]:
         """Create a simple placeholder mesh"""
-        vertices = np.array([
-            [0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1]
-        ], dtype=np.float32)
-        
-        faces = np.array([
-            [0, 1, 2], [0, 1, 3], [1, 2, 3], [0, 2, 3]
-        ], dtype=np.int32)
-        
-        return vertices, faces
+        return _PLACEHOLDER_VERTICES, _PLACEHOLDER_FACES
 
 # Convenience function for easy access
 def create_geometry_generator(config: GeometryConfig = None) -> GeometryGenerator:
@@ -1,4 +1,5 @@
 import os
+import re
 import json
 import logging
 import numpy as np
@@ -6,6 +7,36 @@ import trimesh
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 
+# Prompt keywords for each library material, in priority order
+_MATERIAL_PRIORITY = ('metal', 'plastic', 'wood', 'stone', 'glass', 'fabric')
+_MATERIAL_KEYWORDS = {
+    'metal': 'metal', 'steel': 'metal', 'iron': 'metal', 'chrome': 'metal', 'silver': 'metal', 'gold': 'metal',
+    'plastic': 'plastic', 'rubber': 'plastic', 'polymer': 'plastic',
+    'wood': 'wood', 'wooden': 'wood', 'oak': 'wood', 'pine': 'wood',
+    'stone': 'stone', 'rock': 'stone', 'marble': 'stone', 'granite': 'stone',
+    'glass': 'glass', 'crystal': 'glass', 'transparent': 'glass',
+    'fabric': 'fabric', 'cloth': 'fabric', 'textile': 'fabric', 'leather': 'fabric',
+}
+# Lookahead so overlapping keywords are all found in one scan
+_MATERIAL_KEYWORD_PATTERN = re.compile('(?=(%s))' % '|'.join(sorted(_MATERIAL_KEYWORDS, key=len, reverse=True)))
+
+# Metal tints picked out by the prompt, first match wins
+_METAL_TINTS = (
+    ('gold', [0.9, 0.7, 0.1]),
+    ('silver', [0.8, 0.8, 0.9]),
+)
+
+# Noise source for procedural textures
+_texture_rng = np.random.default_rng()
+
+# Per-channel weight of the wood grain lines (red, green, blue)
+_WOOD_GRAIN_CHANNELS = np.array([1.0, 0.8, 0.6])
+
+
+def _tinted(material: Dict, delta: np.ndarray) -> np.ndarray:
+    """Offset the material's diffuse color by a (height, width, 1 or 3) delta, clamped to 0-1"""
+    return np.clip(np.asarray(material['diffuse'][:3], dtype=np.float64) + delta, 0.0, 1.0)
+
 
 class MaterialGenerator:
     """Generate materials and textures for 3D models"""
@@ -75,26 +106,16 @@ class MaterialGenerator:
         """
         prompt_lower = prompt.lower()
 
-        # Detect material type from prompt
-        if any(word in prompt_lower for word in ['metal', 'steel', 'iron', 'chrome', 'silver', 'gold']):
-            base_material = self.material_library['metal'].copy()
-            if 'gold' in prompt_lower:
-                base_material['diffuse'] = [0.9, 0.7, 0.1]
-            elif 'silver' in prompt_lower:
-                base_material['diffuse'] = [0.8, 0.8, 0.9]
-        elif any(word in prompt_lower for word in ['plastic', 'rubber', 'polymer']):
-            base_material = self.material_library['plastic'].copy()
-        elif any(word in prompt_lower for word in ['wood', 'wooden', 'oak', 'pine']):
-            base_material = self.material_library['wood'].copy()
-        elif any(word in prompt_lower for word in ['stone', 'rock', 'marble', 'granite']):
-            base_material = self.material_library['stone'].copy()
-        elif any(word in prompt_lower for word in ['glass', 'crystal', 'transparent']):
-            base_material = self.material_library['glass'].copy()
-        elif any(word in prompt_lower for word in ['fabric', 'cloth', 'textile', 'leather']):
-            base_material = self.material_library['fabric'].copy()
-        else:
-            # Default material
-            base_material = self.material_library['plastic'].copy()
+        # Detect material type from prompt: one scan for every keyword, earliest material wins
+        keywords = set(_MATERIAL_KEYWORD_PATTERN.findall(prompt_lower))
+        found = {_MATERIAL_KEYWORDS[keyword] for keyword in keywords}
+        material_name = next((name for name in _MATERIAL_PRIORITY if name in found), 'plastic')  # Default material
+        base_material = self.material_library[material_name].copy()
+        if material_name == 'metal':
+            for tint, diffuse in _METAL_TINTS:
+                if tint in keywords:
+                    base_material['diffuse'] = list(diffuse)
+                    break
 
         # Apply style modifications
         if style == "cartoon":
@@ -154,76 +175,61 @@ class MaterialGenerator:
 
     def _generate_spherical_uv(self, mesh: trimesh.Trimesh) -> np.ndarray:
         """Generate spherical UV mapping"""
-        vertices = mesh.vertices
-        uv_coords = []
-
-        for vertex in vertices:
-            # Normalize vertex position
-            if np.linalg.norm(vertex) > 0:
-                normalized = vertex / np.linalg.norm(vertex)
-            else:
-                normalized = vertex
+        vertices = mesh.vertices.view(np.ndarray)
 
-            # Convert to UV coordinates
-            u = 0.5 + (np.arctan2(normalized[2], normalized[0]) / (2 * np.pi))
-            v = 0.5 - (np.arcsin(normalized[1]) / np.pi)
+        # Normalize vertex positions (vertices at the origin stay as they are)
+        norms = np.linalg.norm(vertices, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        normalized = vertices / norms
 
-            uv_coords.append([u, v])
+        # Convert to UV coordinates
+        u = 0.5 + (np.arctan2(normalized[:, 2], normalized[:, 0]) / (2 * np.pi))
+        v = 0.5 - (np.arcsin(np.clip(normalized[:, 1], -1.0, 1.0)) / np.pi)
 
-        return np.array(uv_coords)
+        return np.column_stack((u, v))
 
     def _generate_cylindrical_uv(self, mesh: trimesh.Trimesh) -> np.ndarray:
         """Generate cylindrical UV mapping"""
-        vertices = mesh.vertices
-        uv_coords = []
+        vertices = mesh.vertices.view(np.ndarray)
 
-        for vertex in vertices:
-            # Calculate angle around Y axis
-            angle = np.arctan2(vertex[0], vertex[2])
-            u = (angle + np.pi) / (2 * np.pi)
+        # Calculate angle around Y axis
+        angle = np.arctan2(vertices[:, 0], vertices[:, 2])
+        u = (angle + np.pi) / (2 * np.pi)
 
-            # Use Y coordinate for V
-            v = (vertex[1] + 1.0) / 2.0  # Normalize to 0-1
+        # Use Y coordinate for V
+        v = (vertices[:, 1] + 1.0) / 2.0  # Normalize to 0-1
 
-            uv_coords.append([u, v])
-
-        return np.array(uv_coords)
+        return np.column_stack((u, v))
 
     def _generate_planar_uv(self, mesh: trimesh.Trimesh) -> np.ndarray:
         """Generate planar UV mapping"""
-        vertices = mesh.vertices
-        uv_coords = []
+        vertices = mesh.vertices.view(np.ndarray)
 
         # Find bounds
         min_coords = np.min(vertices, axis=0)
-        max_coords = np.max(vertices, axis=0)
-
-        for vertex in vertices:
-            # Map X and Z to U and V
-            u = (vertex[0] - min_coords[0]) / (max_coords[0] - min_coords[0]) if max_coords[0] != min_coords[0] else 0.0
-            v = (vertex[2] - min_coords[2]) / (max_coords[2] - min_coords[2]) if max_coords[2] != min_coords[2] else 0.0
+        extent = np.max(vertices, axis=0) - min_coords
 
-            uv_coords.append([u, v])
+        # Map X and Z to U and V; flat axes map to 0
+        uv_coords = np.zeros((len(vertices), 2))
+        for column, axis in enumerate((0, 2)):
+            if extent[axis] != 0:
+                uv_coords[:, column] = (vertices[:, axis] - min_coords[axis]) / extent[axis]
 
-        return np.array(uv_coords)
+        return uv_coords
 
     def _generate_procedural_uv(self, mesh: trimesh.Trimesh) -> np.ndarray:
         """Generate procedural UV mapping based on vertex properties"""
-        vertices = mesh.vertices
-        uv_coords = []
-
-        for vertex in vertices:
-            # Use vertex position and normal to create unique UV
-            # This creates a more organic texture mapping
-            x, y, z = vertex
-
-            # Combine position and some noise for UV
-            u = (x * 0.3 + y * 0.7 + np.random.random() * 0.1) % 1.0
-            v = (z * 0.4 + y * 0.5 + np.random.random() * 0.1) % 1.0
+        # Use vertex position to create unique UV
+        # This creates a more organic texture mapping
+        x, y, z = mesh.vertices.view(np.ndarray).T
 
-            uv_coords.append([u, v])
+        # Combine position and some noise for UV (drawn in the same u, v
+        # order per vertex as before)
+        noise = np.random.random((len(x), 2)) * 0.1
+        u = (x * 0.3 + y * 0.7 + noise[:, 0]) % 1.0
+        v = (z * 0.4 + y * 0.5 + noise[:, 1]) % 1.0
 
-        return np.array(uv_coords)
+        return np.column_stack((u, v))
 
     def create_material_file(self, material: Dict, filename: str) -> str:
         """
@@ -277,25 +283,16 @@ Ns {1000 * (1 - material['roughness'])}
             Mesh with applied material colors
         """
         # Create vertex colors based on material
-        vertex_colors = []
+        vertices = mesh.vertices.view(np.ndarray)
+        base_color = np.asarray(material['diffuse'][:3], dtype=np.float64)
 
-        for vertex in mesh.vertices:
-            # Base color from material
-            base_color = material['diffuse']
+        # Add some variation based on vertex position
+        variation = (vertices[:, 0] * 0.1 + vertices[:, 1] * 0.1 + vertices[:, 2] * 0.1) % 0.2
 
-            # Add some variation based on vertex position
-            variation = (vertex[0] * 0.1 + vertex[1] * 0.1 + vertex[2] * 0.1) % 0.2
+        vertex_colors = np.ones((len(vertices), 4))  # Alpha stays 1.0
+        vertex_colors[:, :3] = np.clip(base_color + variation[:, None] - 0.1, 0.0, 1.0)
 
-            color = [
-                max(0.0, min(1.0, base_color[0] + variation - 0.1)),
-                max(0.0, min(1.0, base_color[1] + variation - 0.1)),
-                max(0.0, min(1.0, base_color[2] + variation - 0.1)),
-                1.0  # Alpha
-            ]
-
-            vertex_colors.append(color)
-
-        # Apply vertex colors to mesh
+        # Apply vertex colors to mesh as one array
         mesh.visual.vertex_colors = vertex_colors
 
         return mesh
@@ -345,100 +342,44 @@ Ns {1000 * (1 - material['roughness'])}
 
     def _generate_metal_texture(self, width: int, height: int, material: Dict) -> np.ndarray:
         """Generate metallic texture"""
-        texture = np.zeros((height, width, 3))
-
-        # Create brushed metal effect
-        for y in range(height):
-            for x in range(width):
-                # Base color
-                base_color = material['diffuse']
-
-                # Add noise for texture
-                noise = (np.random.random() - 0.5) * 0.1
+        y = np.arange(height)[:, None, None]
 
-                # Add horizontal brushing effect
-                brush_effect = np.sin(y * 0.1) * 0.05
+        # Add noise for texture
+        noise = (_texture_rng.random((height, width, 1)) - 0.5) * 0.1
 
-                color = [
-                    max(0.0, min(1.0, base_color[0] + noise + brush_effect)),
-                    max(0.0, min(1.0, base_color[1] + noise + brush_effect)),
-                    max(0.0, min(1.0, base_color[2] + noise + brush_effect))
-                ]
-
-                texture[y, x] = color
+        # Add horizontal brushing effect
+        brush_effect = np.sin(y * 0.1) * 0.05
 
-        return texture
+        return _tinted(material, noise + brush_effect)
 
     def _generate_wood_texture(self, width: int, height: int, material: Dict) -> np.ndarray:
         """Generate wood grain texture"""
-        texture = np.zeros((height, width, 3))
-
-        # Create wood grain pattern
-        for y in range(height):
-            for x in range(width):
-                # Wood grain rings
-                ring_effect = np.sin(np.sqrt((x - width/2)**2 + (y - height/2)**2) * 0.02) * 0.1
-
-                # Wood grain lines
-                grain_effect = np.sin(y * 0.05) * 0.05
+        y, x = np.ogrid[:height, :width]
 
-                # Base wood color
-                base_color = material['diffuse']
+        # Wood grain rings
+        ring_effect = np.sin(np.sqrt((x - width/2)**2 + (y - height/2)**2) * 0.02) * 0.1
 
-                color = [
-                    max(0.0, min(1.0, base_color[0] + ring_effect + grain_effect)),
-                    max(0.0, min(1.0, base_color[1] + ring_effect + grain_effect * 0.8)),
-                    max(0.0, min(1.0, base_color[2] + ring_effect + grain_effect * 0.6))
-                ]
-
-                texture[y, x] = color
+        # Wood grain lines, weaker in green and blue
+        grain_effect = np.sin(y * 0.05) * 0.05
 
-        return texture
+        return _tinted(material, ring_effect[..., None] + grain_effect[..., None] * _WOOD_GRAIN_CHANNELS)
 
     def _generate_stone_texture(self, width: int, height: int, material: Dict) -> np.ndarray:
         """Generate stone texture"""
-        texture = np.zeros((height, width, 3))
-
-        # Create mottled stone effect
-        for y in range(height):
-            for x in range(width):
-                # Multiple octaves of noise for stone texture
-                noise1 = np.random.random() * 0.1
-                noise2 = np.sin(x * 0.03) * np.cos(y * 0.03) * 0.05
-
-                base_color = material['diffuse']
+        y, x = np.ogrid[:height, :width]
 
-                color = [
-                    max(0.0, min(1.0, base_color[0] + noise1 + noise2)),
-                    max(0.0, min(1.0, base_color[1] + noise1 + noise2)),
-                    max(0.0, min(1.0, base_color[2] + noise1 + noise2))
-                ]
-
-                texture[y, x] = color
+        # Multiple octaves of noise for stone texture
+        noise1 = _texture_rng.random((height, width)) * 0.1
+        noise2 = np.sin(x * 0.03) * np.cos(y * 0.03) * 0.05
 
-        return texture
+        return _tinted(material, (noise1 + noise2)[..., None])
 
     def _generate_generic_texture(self, width: int, height: int, material: Dict) -> np.ndarray:
         """Generate generic procedural texture"""
-        texture = np.zeros((height, width, 3))
-
         # Simple noise-based texture
-        for y in range(height):
-            for x in range(width):
-                noise = (np.random.random() - 0.5) * 0.2
-
-                base_color = material['diffuse']
-
-                color = [
-                    max(0.0, min(1.0, base_color[0] + noise)),
-                    max(0.0, min(1.0, base_color[1] + noise)),
-                    max(0.0, min(1.0, base_color[2] + noise))
-                ]
-
-                texture[y, x] = color
-
-        return texture
+        noise = (_texture_rng.random((height, width, 1)) - 0.5) * 0.2
 
+        return _tinted(material, noise)
 
 def create_material_generator() -> MaterialGenerator:
     """Factory function to create material generator"""
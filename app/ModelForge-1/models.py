@@ -273,6 +273,11 @@ class ProjectVersion(db.Model):
         }
 
 class ChatMessage(db.Model):
+    # Serves the per-session "latest N messages" context query as an index range scan
+    __table_args__ = (
+        db.Index('ix_chat_message_session_created', 'session_id', 'created_at'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     session_id = db.Column(db.String(255), nullable=False)
     message_type = db.Column(db.String(20), nullable=False)  # user, assistant, system
@@ -6,7 +6,7 @@ import json
 from datetime import datetime
 import tempfile
 from datetime import datetime
-from flask import render_template, request, jsonify, send_file, flash, redirect, url_for, session
+from flask import render_template, request, jsonify, send_file, flash, redirect, url_for, session, Response, stream_with_context
 from werkzeug.utils import secure_filename
 from werkzeug.utils import secure_filename
 from app import app, db
@@ -17,7 +17,9 @@ from models import (
 from model_generator import generate_3d_model
 from file_converter import convert_to_fbx, convert_to_blend
 try:
-    from instance.ai_modules.chat_handler import ChatHandler
+    from instance.ai_modules.chat_handler import (
+        ChatHandler, run_sync as run_chat_coroutine, iter_sync as iter_chat_stream
+    )
     from instance.ai_modules.script_generator import generate_lua_script
     from instance.ai_modules.environment_generator import generate_environment
 except Exception:
@@ -27,6 +29,10 @@ except Exception:
             pass
         def chat(self, *args, **kwargs):
             return {"response": "AI module not installed. This is a stub response."}
+    def run_chat_coroutine(result):
+        return result
+    def iter_chat_stream(events):
+        return iter(events)
     def generate_lua_script(prompt: str, lang: str):
         return f"-- Stub {lang} script for: {prompt}\n-- (AI module not installed)\n"
     def generate_environment(*args, **kwargs):
@@ -1110,75 +1116,9 @@ def api_chat():
         
         # Process message with AI chat handler
         chat_handler = ChatHandler(db.session)
-        response_data = chat_handler.process_message(message, session_id, project_id)
-        
-        # Execute actions if any
-        if 'actions' in response_data:
-            for action in response_data['actions']:
-                try:
-                    if action['type'] == 'generate_3d_model':
-                        # Create generation job
-                        job = GenerationJob(
-                            prompt=action['params']['prompt'],
-                            status='pending',
-                            project_id=action['params'].get('project_id')
-                        )
-                        db.session.add(job)
-                        db.session.commit()
-                        
-                        response_data['job_id'] = job.id
-                        
-                    elif action['type'] == 'generate_script':
-                        # Generate script
-                        script_content = generate_lua_script(
-                            action['params']['prompt'],
-                            action['params']['script_type']
-                        )
-                        
-                        script = GeneratedScript(
-                            name=f"generated_script_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-                            script_type=action['params']['script_type'],
-                            content=script_content,
-                            prompt=action['params']['prompt'],
-                            project_id=action['params'].get('project_id')
-                        )
-                        db.session.add(script)
-                        db.session.commit()
-                        
-                        response_data['script_id'] = script.id
-                        
-                    elif action['type'] == 'create_project':
-                        # Create new project
-                        project = Project(
-                            name=action['params']['name'],
-                            description=action['params']['description'],
-                            project_type=action['params'].get('project_type', 'general'),
-                            status='draft'
-                        )
-                        db.session.add(project)
-                        db.session.commit()
-                        
-                        response_data['project_id'] = project.id
-                        
-                    elif action['type'] == 'generate_environment':
-                        # Generate environment
-                        env_data = generate_environment(action['params']['prompt'])
-                        
-                        environment = GeneratedEnvironment(
-                            name=f"generated_world_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-                            environment_type=env_data.get('type', 'unknown'),
-                            environment_data=env_data,
-                            prompt=action['params']['prompt'],
-                            project_id=action['params'].get('project_id')
-                        )
-                        db.session.add(environment)
-                        db.session.commit()
-                        
-                        response_data['environment_id'] = environment.id
-                        
-                except Exception as action_error:
-                    logging.error(f"Error executing action {action['type']}: {action_error}")
-                    # Continue with other actions even if one fails
+        response_data = run_chat_coroutine(chat_handler.process_message(message, session_id, project_id))
+        
+        execute_chat_actions(response_data)
         
         return jsonify(response_data)
         
@@ -1186,6 +1126,104 @@ def api_chat():
         logging.error(f"Error in chat API: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/chat/stream', methods=['POST'])
+def api_chat_stream():
+    """Stream the assistant reply as Server-Sent Events"""
+    data = request.get_json()
+    message = data.get('message', '').strip()
+    session_id = data.get('session_id')
+    project_id = data.get('project_id')
+    
+    if not message:
+        return jsonify({'error': 'Message is required'}), 400
+    
+    if not session_id:
+        return jsonify({'error': 'Session ID is required'}), 400
+    
+    chat_handler = ChatHandler(db.session)
+    
+    def generate():
+        for event in iter_chat_stream(chat_handler.process_message_stream(message, session_id, project_id)):
+            # Actions can arrive mid-stream; the final event only lists ones not yet run
+            if event.get('actions'):
+                execute_chat_actions(event)
+            yield f"data: {json.dumps(event)}\n\n"
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def execute_chat_actions(response_data):
+    """Run the actions requested by a chat response, recording created ids on it"""
+    if 'actions' in response_data:
+        for action in response_data['actions']:
+            try:
+                if action['type'] == 'generate_3d_model':
+                    # Create generation job
+                    job = GenerationJob(
+                        prompt=action['params']['prompt'],
+                        status='pending',
+                        project_id=action['params'].get('project_id')
+                    )
+                    db.session.add(job)
+                    db.session.commit()
+                    
+                    response_data['job_id'] = job.id
+                    
+                elif action['type'] == 'generate_script':
+                    # Generate script
+                    script_content = generate_lua_script(
+                        action['params']['prompt'],
+                        action['params']['script_type']
+                    )
+                    
+                    script = GeneratedScript(
+                        name=f"generated_script_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+                        script_type=action['params']['script_type'],
+                        content=script_content,
+                        prompt=action['params']['prompt'],
+                        project_id=action['params'].get('project_id')
+                    )
+                    db.session.add(script)
+                    db.session.commit()
+                    
+                    response_data['script_id'] = script.id
+                    
+                elif action['type'] == 'create_project':
+                    # Create new project
+                    project = Project(
+                        name=action['params']['name'],
+                        description=action['params']['description'],
+                        project_type=action['params'].get('project_type', 'general'),
+                        status='draft'
+                    )
+                    db.session.add(project)
+                    db.session.commit()
+                    
+                    response_data['project_id'] = project.id
+                    
+                elif action['type'] == 'generate_environment':
+                    # Generate environment
+                    env_data = generate_environment(action['params']['prompt'])
+                    
+                    environment = GeneratedEnvironment(
+                        name=f"generated_world_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+                        environment_type=env_data.get('type', 'unknown'),
+                        environment_data=env_data,
+                        prompt=action['params']['prompt'],
+                        project_id=action['params'].get('project_id')
+                    )
+                    db.session.add(environment)
+                    db.session.commit()
+                    
+                    response_data['environment_id'] = environment.id
+                    
+            except Exception as action_error:
+                logging.error(f"Error executing action {action['type']}: {action_error}")
+                # Continue with other actions even if one fails
+
 # ========== SCRIPT GENERATION ROUTES ==========
 
 @app.route('/api/scripts', methods=['GET', 'POST'])
@@ -16,7 +16,7 @@ setup(
         'flask-sqlalchemy>=2.5.0',
         'flask-cors>=3.0.0',
     ],
-    python_requires='>=3.8',
+    python_requires='>=3.11',
     include_package_data=True,
     package_data={
         '': ['*.yaml', '*.json', '*.glb', '*.gltf', '*.bin'],
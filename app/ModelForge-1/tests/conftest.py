@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Import the modules directly: the package __init__ pulls in the torch-backed
+# generators, which these tests don't need
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'instance', 'ai_modules'))
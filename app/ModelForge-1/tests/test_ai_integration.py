@@ -0,0 +1,35 @@
+import base64
+import os
+
+from ai_integration import AIConfig, AIIntegration, AIService
+
+
+def _integration():
+    return AIIntegration(AIConfig(service=AIService.CUSTOM_API, api_key=''))
+
+
+def test_encode_image_matches_file_contents(tmp_path):
+    path = tmp_path / 'ref.png'
+    path.write_bytes(b'\x89PNG fake image bytes')
+
+    assert _integration()._encode_image(str(path)) == base64.b64encode(path.read_bytes()).decode('ascii')
+
+
+def test_encode_image_sees_edits(tmp_path):
+    path = tmp_path / 'ref.png'
+    path.write_bytes(b'first')
+    integration = _integration()
+    assert integration._encode_image(str(path)) == base64.b64encode(b'first').decode('ascii')
+
+    path.write_bytes(b'second version')
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert integration._encode_image(str(path)) == base64.b64encode(b'second version').decode('ascii')
+
+
+def test_encode_image_handles_empty_and_missing_files(tmp_path):
+    empty = tmp_path / 'empty.png'
+    empty.write_bytes(b'')
+
+    assert _integration()._encode_image(str(empty)) == ''
+    assert _integration()._encode_image(str(tmp_path / 'missing.png')) is None
@@ -0,0 +1,92 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+import chat_handler
+from chat_handler import ChatHandler, ResponseCache
+
+
+def _reply(text, actions=None):
+    return {'response': text, 'actions': actions or [], 'meta_data': {'ai_generated': True}}
+
+
+@pytest.fixture
+def handler(monkeypatch):
+    """Handler with a fresh cache, a fixed embedding and a counting stand-in for the API"""
+    monkeypatch.setattr(chat_handler, 'response_cache', ResponseCache())
+    handler = ChatHandler(None)
+    handler.calls = []
+
+    async def embed_message(message):
+        return np.array([1.0, 0.0], dtype=np.float32)
+
+    async def process_with_ai(message, context, project_id=None):
+        # Only completions that run to the end count as calls
+        await asyncio.sleep(0.01)
+        handler.calls.append(message)
+        if 'sword' in message:
+            return _reply('Creating it', [{'type': 'generate_3d_model', 'params': {'prompt': message}}])
+        return _reply(f'About {message}')
+
+    handler.embed_message = embed_message
+    handler.process_with_ai = process_with_ai
+    return handler
+
+
+def test_exact_repeat_is_served_from_cache(handler):
+    async def run():
+        first = await handler.process_with_cache('what is lua', [], None)
+        second = await handler.process_with_cache('what is lua', [], None)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert handler.calls == ['what is lua']
+    assert second['response'] == first['response']
+    assert second['meta_data']['cache_hit'] is True
+
+
+def test_paraphrase_reuses_plain_text_reply(handler):
+    async def run():
+        await handler.process_with_cache('what is lua', [], None)
+        return await handler.process_with_cache('what is lua?', [], None)
+
+    reply = asyncio.run(run())
+    assert handler.calls == ['what is lua']
+    assert reply['response'] == 'About what is lua'
+    assert reply['meta_data']['cache_hit'] is True
+
+
+def test_paraphrase_never_replays_actions(handler):
+    async def run():
+        await handler.process_with_cache('make a red sword', [], None)
+        return await handler.process_with_cache('make a blue sword', [], None)
+
+    reply = asyncio.run(run())
+    assert handler.calls == ['make a red sword', 'make a blue sword']
+    assert reply['actions'][0]['params']['prompt'] == 'make a blue sword'
+
+
+def test_identical_concurrent_requests_share_one_call(handler):
+    async def run():
+        return await asyncio.gather(*(handler.process_with_cache('what is lua', [], None) for _ in range(3)))
+
+    replies = asyncio.run(run())
+    assert handler.calls == ['what is lua']
+    assert {reply['response'] for reply in replies} == {'About what is lua'}
+    assert sum(bool(reply['meta_data'].get('coalesced')) for reply in replies) == 2
+
+
+def test_fallback_replies_are_not_cached(handler):
+    async def fallback(message, context, project_id=None):
+        handler.calls.append(message)
+        return {'response': 'offline', 'actions': [], 'meta_data': {'fallback': True}}
+
+    handler.process_with_ai = fallback
+
+    async def run():
+        await handler.process_with_cache('what is lua', [], None)
+        await handler.process_with_cache('what is lua', [], None)
+
+    asyncio.run(run())
+    assert handler.calls == ['what is lua', 'what is lua']
@@ -0,0 +1,47 @@
+import numpy as np
+
+from environment_generator import (
+    MATERIAL_PALETTE, decode_heightmap, decode_materials, encode_heightmap, encode_materials, generate_terrain
+)
+
+
+def test_heightmap_round_trip_within_one_step():
+    heights = np.random.default_rng(0).random((12, 7)) * 40
+    encoded = encode_heightmap(heights)
+    decoded = decode_heightmap(encoded)
+
+    assert encoded['encoding'] == 'uint8-base64'
+    assert decoded.shape == (12, 7)
+    assert decoded.dtype == np.float32
+    assert np.abs(decoded - heights).max() <= encoded['scale'] / 2 + 1e-5
+    assert decoded.max() == np.float32(heights.max())
+
+
+def test_flat_heightmap_decodes_to_zero():
+    decoded = decode_heightmap(encode_heightmap(np.zeros((3, 4))))
+    assert decoded.shape == (3, 4)
+    assert not decoded.any()
+
+
+def test_terrain_heightmap_is_encoded():
+    terrain = generate_terrain('mountain', (16, 16), np.random.default_rng(1))
+    heights = decode_heightmap(terrain['heightmap'])
+    assert heights.shape == (16, 16)
+    assert heights.min() >= 0
+
+
+def test_material_grid_round_trip():
+    indices = np.random.default_rng(2).integers(0, len(MATERIAL_PALETTE), (5, 9), dtype=np.uint8)
+    encoded = encode_materials(indices)
+    decoded = decode_materials(encoded)
+
+    assert encoded['palette'] == list(MATERIAL_PALETTE)
+    assert decoded.shape == (5, 9)
+    assert (decoded == np.asarray(MATERIAL_PALETTE)[indices]).all()
+
+
+def test_terrain_materials_use_the_palette():
+    terrain = generate_terrain('beach', (32, 32), np.random.default_rng(3))
+    materials = decode_materials(terrain['materials'])
+    assert materials.shape == (32, 32)
+    assert set(materials.ravel()) <= set(MATERIAL_PALETTE)
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from environment_generator import (
+    StructureBuffer, generate_paths, generate_straight_path, minimum_spanning_edges
+)
+
+
+def _reference_points(positions):
+    """Per-road points from the one-road-at-a-time rasterizer"""
+    return [
+        generate_straight_path(tuple(positions[a].tolist()), tuple(positions[b].tolist()))
+        for a, b in minimum_spanning_edges(positions)
+    ]
+
+
+@pytest.mark.parametrize('seed', range(25))
+def test_paths_match_straight_path_per_edge(seed):
+    rng = np.random.default_rng(seed)
+    structures = StructureBuffer()
+    count = int(rng.integers(2, 12))
+    xs = rng.integers(0, 100, count).tolist()
+    ys = rng.integers(0, 100, count).tolist()
+    # Houses are road hubs; the tree is not and must be ignored
+    structures.extend(['House'] * count, xs, ys, 4, 4)
+    structures.add('Tree', 50, 50)
+
+    paths = generate_paths(structures, (100, 100))
+    positions = structures.positions(structures.mask({'House'}))
+    assert [path['points'] for path in paths] == _reference_points(positions)
+
+
+def test_zero_length_edge_gives_an_empty_road():
+    structures = StructureBuffer()
+    structures.extend(['Shop', 'Shop', 'House'], [10, 10, 13], [20, 20, 27], 4, 4)
+
+    paths = generate_paths(structures, (50, 50))
+    assert [path['points'] for path in paths] == _reference_points(structures.positions())
+    assert [] in [path['points'] for path in paths]
+
+
+def test_road_ends_exactly_on_its_end_structure():
+    # 22 * (15 / 22) rounds to just under 15, so the end point must be pinned
+    structures = StructureBuffer()
+    structures.extend(['House', 'House'], [0, 22], [0, 15], 4, 4)
+
+    points = generate_paths(structures, (30, 30))[0]['points']
+    assert points == _reference_points(structures.positions())[0]
+    assert points[-1] == {'x': 22, 'y': 15}
+
+
+def test_no_paths_without_two_hubs():
+    structures = StructureBuffer()
+    structures.add('House', 5, 5)
+    structures.add('Tree', 9, 9)
+    assert generate_paths(structures, (20, 20)) == []
@@ -0,0 +1,54 @@
+import numpy as np
+import trimesh
+
+from export_engine import ExportEngine, ExportFormat, OptimizationConfig
+
+
+def _load_obj(path):
+    return trimesh.load(str(path), file_type='obj', process=False)
+
+
+def test_obj_round_trip(tmp_path):
+    mesh = trimesh.creation.box()
+    path = tmp_path / 'box.obj'
+
+    assert ExportEngine().export_model(mesh, ExportFormat.OBJ, str(path))
+    loaded = _load_obj(path)
+    assert np.allclose(loaded.vertices, mesh.vertices, atol=1e-6)
+    assert (loaded.faces == mesh.faces).all()
+
+
+def test_obj_keeps_vertex_colors(tmp_path):
+    mesh = trimesh.creation.box()
+    colors = np.random.default_rng(0).integers(0, 256, (len(mesh.vertices), 4), dtype=np.uint8)
+    colors[:, 3] = 255
+    mesh.visual.vertex_colors = colors
+    path = tmp_path / 'colored.obj'
+
+    assert ExportEngine().export_model(mesh, ExportFormat.OBJ, str(path))
+    loaded = _load_obj(path)
+    assert loaded.visual.kind == 'vertex'
+    assert (np.asarray(loaded.visual.vertex_colors)[:, :3] == colors[:, :3]).all()
+
+
+def test_lods_halve_over_one_vertex_buffer():
+    mesh = trimesh.creation.icosphere(subdivisions=4)
+    chain = ExportEngine(OptimizationConfig(target_poly_count=10000)).generate_lods(mesh)
+
+    face_counts = [len(level) for level in chain.levels]
+    assert len(face_counts) == 4
+    assert face_counts[0] == len(mesh.faces)
+    for previous, current in zip(face_counts, face_counts[1:]):
+        assert current <= previous // 2 + 1
+    for level in chain.levels:
+        assert level.max() < len(chain.vertices)
+    assert len(chain.mesh(2).faces) == face_counts[2]
+
+
+def test_lods_disabled_returns_base_level_only():
+    mesh = trimesh.creation.icosphere(subdivisions=3)
+    config = OptimizationConfig(target_poly_count=10000, generate_lods=False)
+    chain = ExportEngine(config).generate_lods(mesh)
+
+    assert len(chain.levels) == 1
+    assert len(chain.mesh(0).faces) == len(mesh.faces)
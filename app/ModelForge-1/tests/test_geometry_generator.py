@@ -0,0 +1,17 @@
+from geometry_generator import _classify_shape, _prompt_shape
+
+
+def test_prompt_shape_ignores_case():
+    assert _prompt_shape('A Big SPHERE') == 'sphere'
+    assert _prompt_shape('tall Pipe') == 'cylinder'
+    assert _prompt_shape('a chair') == 'cube'
+
+
+def test_case_variants_share_one_classification():
+    _classify_shape.cache_clear()
+    _prompt_shape('Stone Pyramid')
+    _prompt_shape('stone pyramid')
+    _prompt_shape('STONE PYRAMID')
+
+    info = _classify_shape.cache_info()
+    assert (info.misses, info.hits) == (1, 2)
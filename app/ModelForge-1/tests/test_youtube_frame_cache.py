@@ -0,0 +1,53 @@
+import sys
+
+import numpy as np
+import pytest
+
+from enhanced_generator import YouTubeProcessor
+
+URL = 'https://youtu.be/abcdefghijk'
+
+
+@pytest.fixture
+def processor(tmp_path, monkeypatch):
+    # A cache miss tries to download; without yt_dlp that fails and yields no frames
+    monkeypatch.setitem(sys.modules, 'yt_dlp', None)
+    return YouTubeProcessor(cache_dir=str(tmp_path))
+
+
+def _cache(processor, name, shape, value):
+    video_dir = processor.cache_dir / 'abcdefghijk'
+    video_dir.mkdir(exist_ok=True)
+    np.save(video_dir / processor.FRAMES_FILE.format(name), np.full((4,) + shape + (3,), value, dtype=np.uint8))
+
+
+def test_exact_resolution_is_served(processor):
+    _cache(processor, 64, (64, 64), 10)
+    frames = processor.extract_frames(URL, resolution=64)
+    assert frames.shape == (4, 64, 64, 3)
+
+
+def test_smallest_larger_resolution_is_scaled_down(processor):
+    _cache(processor, 64, (64, 64), 10)
+    _cache(processor, 128, (128, 128), 20)
+    _cache(processor, 'native', (72, 96), 30)
+
+    frames = processor.extract_frames(URL, resolution=32)
+    assert frames.shape == (4, 32, 32, 3)
+    assert (frames == 10).all()
+
+
+def test_native_frames_are_scaled_down(processor):
+    _cache(processor, 'native', (72, 96), 30)
+
+    frames = processor.extract_frames(URL, resolution=48)
+    assert frames.shape == (4, 48, 48, 3)
+    assert (frames == 30).all()
+
+
+@pytest.mark.parametrize('resolution', [None, 512])
+def test_smaller_frames_are_not_served(processor, resolution):
+    _cache(processor, 64, (64, 64), 10)
+
+    frames = processor.extract_frames(URL, resolution=resolution)
+    assert len(frames) == 0